@@ -5,7 +5,7 @@ Contains all AI agents for the automated digital marketing agency
 
 from .lead_generation_agent import LeadGenerationAgent, Lead
 from .prospect_research_agent import ProspectResearchAgent, CompanyIntelligence
-from .lead_scoring_agent import LeadScoringAgent, ScoringCriteria
+from .lead_scoring_agent import LeadScoringAgent, ScoringCriteria, LeadBatch
 
 __all__ = [
     'LeadGenerationAgent',
@@ -13,6 +13,7 @@ __all__ = [
     'ProspectResearchAgent', 
     'CompanyIntelligence',
     'LeadScoringAgent',
-    'ScoringCriteria'
+    'ScoringCriteria',
+    'LeadBatch'
 ]
 
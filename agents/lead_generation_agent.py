@@ -18,7 +18,7 @@ import re
 
 # Add parent directory to path to import API modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from api_integrations import APIIntegrationService
+from api_integrations import get_integration_service
 
 
 @dataclass
@@ -64,7 +64,7 @@ class LeadGenerationAgent:
         })
         
         # Initialize API integration service
-        self.api_service = APIIntegrationService()
+        self.api_service = get_integration_service()
         
         # Lead scoring weights
         self.scoring_weights = {
@@ -10,6 +10,122 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import math
+import time
+
+
+# Upsert keyed on idx_lead_scores_lead_id; leads whose total is unchanged
+# are left untouched instead of being deleted and re-inserted
+INSERT_LEAD_SCORE_SQL = '''
+    INSERT INTO lead_scores (
+        lead_id, company_name, total_score, company_size_score,
+        industry_score, digital_maturity_score, contact_quality_score,
+        growth_indicators_score, pain_points_score, scoring_date, scoring_version
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(lead_id) DO UPDATE SET
+        company_name = excluded.company_name,
+        total_score = excluded.total_score,
+        company_size_score = excluded.company_size_score,
+        industry_score = excluded.industry_score,
+        digital_maturity_score = excluded.digital_maturity_score,
+        contact_quality_score = excluded.contact_quality_score,
+        growth_indicators_score = excluded.growth_indicators_score,
+        pain_points_score = excluded.pain_points_score,
+        scoring_date = excluded.scoring_date,
+        scoring_version = excluded.scoring_version
+    WHERE excluded.total_score IS NOT lead_scores.total_score
+'''
+
+LEAD_BATCH_SQL = '''
+    SELECT l.id, l.company_name, l.employee_count, l.industry,
+           l.contact_email, l.contact_name, l.contact_title, l.phone,
+           ci.id IS NOT NULL, ci.digital_maturity_score,
+           ci.growth_indicators, ci.pain_points
+    FROM leads l
+    LEFT JOIN company_intelligence ci
+        ON ci.company_name = l.company_name AND ci.website = l.website
+'''
+
+SCORING_REPORT_TEMPLATE = """
+LEAD SCORING PERFORMANCE REPORT
+Generated: {generated}
+
+OVERALL STATISTICS:
+- Total Leads Scored: {total_leads}
+- Average Score: {average_score:.3f}
+- Score Range: {min_score:.3f} - {max_score:.3f}
+
+SCORE DISTRIBUTION:
+- High Score (≥0.8): {high_score_percentage:.1f}%
+- Medium Score (0.6-0.8): {medium_score_percentage:.1f}%
+- Low Score (<0.6): {low_score_percentage:.1f}%
+
+SCORING CRITERIA WEIGHTS:
+{criteria_weights}"""
+
+CRITERIA_REPORT_TEMPLATE = """- Company Size: {company_size_weight:.1%}
+- Industry Relevance: {industry_relevance_weight:.1%}
+- Digital Maturity: {digital_maturity_weight:.1%}
+- Contact Quality: {contact_quality_weight:.1%}
+- Growth Indicators: {growth_indicators_weight:.1%}
+- Pain Points: {pain_points_weight:.1%}
+"""
+
+# Window within which generate_scoring_report reuses the last aggregate
+PERFORMANCE_CACHE_SECONDS = 60
+
+# Column order of the component score matrix returned by score_batch
+SCORE_COMPONENTS = (
+    'company_size', 'industry', 'digital_maturity',
+    'contact_quality', 'growth_indicators', 'pain_points'
+)
+
+
+@dataclass
+class LeadBatch:
+    """Columnar (structure-of-arrays) view of leads joined with their intelligence"""
+    lead_id: np.ndarray
+    company_name: np.ndarray
+    employee_count: np.ndarray
+    industry: np.ndarray
+    contact_email: np.ndarray
+    contact_name: np.ndarray
+    contact_title: np.ndarray
+    phone: np.ndarray
+    has_intelligence: np.ndarray
+    digital_maturity: np.ndarray
+    growth_indicators: np.ndarray
+    pain_points: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.lead_id)
+    
+    @classmethod
+    def from_rows(cls, rows: List[Tuple]) -> 'LeadBatch':
+        """Build a batch from LEAD_BATCH_SQL rows in a single pass"""
+        columns = list(zip(*rows)) if rows else [()] * 12
+        
+        def objects(values) -> np.ndarray:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+        
+        def json_lists(values) -> np.ndarray:
+            return objects([json.loads(value) if value else [] for value in values])
+        
+        return cls(
+            lead_id=np.array(columns[0], dtype=np.int64),
+            company_name=objects(columns[1]),
+            employee_count=np.array([count or 0 for count in columns[2]], dtype=np.int64),
+            industry=objects(columns[3]),
+            contact_email=objects(columns[4]),
+            contact_name=objects(columns[5]),
+            contact_title=objects(columns[6]),
+            phone=objects(columns[7]),
+            has_intelligence=np.array(columns[8], dtype=bool),
+            digital_maturity=np.array([score or 0.0 for score in columns[9]], dtype=np.float64),
+            growth_indicators=json_lists(columns[10]),
+            pain_points=json_lists(columns[11])
+        )
 
 
 @dataclass
@@ -55,11 +171,18 @@ class LeadScoringAgent:
     def __init__(self, database_path: str = "leads.db", criteria: ScoringCriteria = None):
         self.database_path = database_path
         self.criteria = criteria or ScoringCriteria()
+        
+        # Persistent connection so SQLite's prepared-statement cache survives
+        # between calls; the SQL text constants above hit it on every reuse
+        self.conn = sqlite3.connect(database_path, cached_statements=256)
         self.setup_database()
         
         # Scoring history for machine learning improvements
         self.scoring_history = []
         
+        # Report cache: (minute bucket, performance dict)
+        self._performance_cache = None
+        
         # Pain point value mapping
         self.pain_point_values = {
             'low_traffic': 0.9,
@@ -85,8 +208,7 @@ class LeadScoringAgent:
     
     def setup_database(self):
         """Initialize database tables for scoring data"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS lead_scores (
@@ -117,8 +239,25 @@ class LeadScoringAgent:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # One score row per lead. Older databases accumulated a row per
+        # scoring run, so keep only the latest, once, when the constraint is first added
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_lead_scores_lead_id'"
+        )
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                DELETE FROM lead_scores
+                WHERE id NOT IN (SELECT MAX(id) FROM lead_scores GROUP BY lead_id)
+            ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX idx_lead_scores_lead_id ON lead_scores(lead_id)
+            ''')
+        
+        self.conn.commit()
+    
+    def close(self):
+        """Close the persistent database connection"""
+        self.conn.close()
     
     def score_company_size(self, employee_count: Optional[int]) -> float:
         """Score based on company size"""
@@ -166,11 +305,17 @@ class LeadScoringAgent:
     
     def score_contact_quality(self, lead_data: Dict) -> float:
         """Score based on contact information quality"""
+        return self._contact_quality(
+            lead_data.get('contact_email'), lead_data.get('contact_name'),
+            lead_data.get('contact_title'), lead_data.get('phone')
+        )
+    
+    def _contact_quality(self, email: Optional[str], name: Optional[str],
+                         title: Optional[str], phone: Optional[str]) -> float:
         score = 0.0
         
         # Email availability and quality
-        if lead_data.get('contact_email'):
-            email = lead_data['contact_email']
+        if email:
             if '@' in email and '.' in email:
                 score += 0.4
                 # Bonus for business email domains
@@ -178,12 +323,12 @@ class LeadScoringAgent:
                     score += 0.1
         
         # Contact name availability
-        if lead_data.get('contact_name'):
+        if name:
             score += 0.2
         
         # Contact title/role information
-        if lead_data.get('contact_title'):
-            title = lead_data['contact_title'].lower()
+        if title:
+            title = title.lower()
             # Higher score for decision-maker titles
             if any(keyword in title for keyword in ['ceo', 'founder', 'owner', 'president', 'director']):
                 score += 0.3
@@ -193,7 +338,7 @@ class LeadScoringAgent:
                 score += 0.1
         
         # Phone number availability
-        if lead_data.get('phone'):
+        if phone:
             score += 0.1
         
         return min(score, 1.0)
@@ -270,17 +415,90 @@ class LeadScoringAgent:
         scores['total'] = total_score
         return scores
     
+    @property
+    def component_weights(self) -> np.ndarray:
+        """Criteria weights in SCORE_COMPONENTS order"""
+        return np.array([
+            self.criteria.company_size_weight,
+            self.criteria.industry_relevance_weight,
+            self.criteria.digital_maturity_weight,
+            self.criteria.contact_quality_weight,
+            self.criteria.growth_indicators_weight,
+            self.criteria.pain_points_weight
+        ], dtype=np.float64)
+    
+    def load_lead_batch(self) -> LeadBatch:
+        """Load every lead with its intelligence data into a columnar batch"""
+        return LeadBatch.from_rows(self.conn.execute(LEAD_BATCH_SQL).fetchall())
+    
+    def score_company_size_batch(self, employee_count: np.ndarray) -> np.ndarray:
+        """Vectorized score_company_size (0 means unknown size)"""
+        min_range, max_range = self.criteria.ideal_employee_range
+        min_threshold = self.criteria.min_employee_threshold
+        counts = employee_count.astype(np.float64)
+        
+        ratio = (counts - min_threshold) / (min_range - min_threshold)
+        decay = 0.6 * np.exp(-(counts - max_range) / 1000)
+        return np.select(
+            [counts == 0, counts < min_threshold, counts < min_range, counts <= max_range],
+            [0.3, 0.2, 0.2 + 0.8 * ratio, 1.0],
+            default=decay
+        )
+    
+    def score_industry_relevance_batch(self, industry: np.ndarray) -> np.ndarray:
+        """Vectorized score_industry_relevance, scoring each distinct industry once"""
+        lookup = {}
+        for value in industry:
+            if value not in lookup:
+                lookup[value] = self.score_industry_relevance(value)
+        return np.fromiter((lookup[value] for value in industry), dtype=np.float64, count=len(industry))
+    
+    def score_digital_maturity_batch(self, maturity: np.ndarray,
+                                     has_intelligence: np.ndarray) -> np.ndarray:
+        """Vectorized score_digital_maturity (0.5 default without intelligence)"""
+        scores = np.where(
+            maturity >= self.criteria.high_maturity_threshold, 1.0,
+            np.where(maturity >= self.criteria.medium_maturity_threshold, 0.7, 0.4)
+        )
+        return np.where(has_intelligence, scores, 0.5)
+    
+    def score_batch(self, batch: LeadBatch) -> np.ndarray:
+        """
+        Score a whole batch at once. Returns an (N, 7) array whose first six
+        columns follow SCORE_COMPONENTS and whose last column is the weighted total.
+        """
+        n = len(batch)
+        scores = np.empty((n, len(SCORE_COMPONENTS) + 1), dtype=np.float64)
+        
+        scores[:, 0] = self.score_company_size_batch(batch.employee_count)
+        scores[:, 1] = self.score_industry_relevance_batch(batch.industry)
+        scores[:, 2] = self.score_digital_maturity_batch(batch.digital_maturity, batch.has_intelligence)
+        scores[:, 3] = np.fromiter(
+            (self._contact_quality(*contact) for contact in zip(
+                batch.contact_email, batch.contact_name, batch.contact_title, batch.phone
+            )),
+            dtype=np.float64, count=n
+        )
+        scores[:, 4] = np.fromiter(
+            (self.score_growth_indicators(indicators) for indicators in batch.growth_indicators),
+            dtype=np.float64, count=n
+        )
+        scores[:, 5] = np.fromiter(
+            (self.score_pain_points(pain_points) for pain_points in batch.pain_points),
+            dtype=np.float64, count=n
+        )
+        scores[:, 6] = scores[:, :6] @ self.component_weights
+        return scores
+    
     def score_lead(self, lead_id: int) -> Optional[Dict[str, float]]:
         """Score a single lead by ID"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Get lead data
         cursor.execute('SELECT * FROM leads WHERE id = ?', (lead_id,))
         lead_row = cursor.fetchone()
         
         if not lead_row:
-            conn.close()
             return None
         
         # Convert to dict
@@ -306,8 +524,6 @@ class LeadScoringAgent:
                 if intelligence_data.get(field):
                     intelligence_data[field] = json.loads(intelligence_data[field])
         
-        conn.close()
-        
         # Calculate scores
         scores = self.calculate_composite_score(lead_data, intelligence_data)
         
@@ -318,49 +534,174 @@ class LeadScoringAgent:
     
     def save_lead_score(self, lead_id: int, company_name: str, scores: Dict[str, float]):
         """Save lead scores to database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO lead_scores (
-                lead_id, company_name, total_score, company_size_score,
-                industry_score, digital_maturity_score, contact_quality_score,
-                growth_indicators_score, pain_points_score, scoring_date, scoring_version
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self.conn.execute(INSERT_LEAD_SCORE_SQL, (
             lead_id, company_name, scores['total'], scores['company_size'],
             scores['industry'], scores['digital_maturity'], scores['contact_quality'],
             scores['growth_indicators'], scores['pain_points'],
             datetime.now().isoformat(), "1.0"
         ))
         
-        conn.commit()
-        conn.close()
+        self.conn.commit()
+        self._performance_cache = None
     
     def score_all_leads(self) -> List[Dict]:
         """Score all leads in the database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        batch = self.load_lead_batch()
+        if not len(batch):
+            return []
+        
+        score_matrix = self.score_batch(batch)
+        scoring_date = datetime.now().isoformat()
+        
+        self.conn.executemany(INSERT_LEAD_SCORE_SQL, (
+            (int(lead_id), company_name, row[6], *row[:6], scoring_date, "1.0")
+            for lead_id, company_name, row in zip(
+                batch.lead_id, batch.company_name, score_matrix.tolist()
+            )
+        ))
+        self.conn.commit()
+        self._performance_cache = None
         
-        cursor.execute('SELECT id FROM leads')
-        lead_ids = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        scored_leads = []
+        for lead_id, row in zip(batch.lead_id.tolist(), score_matrix.tolist()):
+            scores = dict(zip(SCORE_COMPONENTS, row))
+            scores['total'] = row[6]
+            scored_leads.append({
+                'lead_id': lead_id,
+                'scores': scores
+            })
+        
+        return scored_leads
+    
+    def score_all_leads_duckdb(self) -> List[Dict]:
+        """
+        Score all leads with one vectorized DuckDB query over the SQLite file.
+        Requires the optional duckdb package; results are written back to
+        lead_scores so the rest of the agent reads them as usual.
+        """
+        import duckdb
+        
+        duck = duckdb.connect()
+        try:
+            duck.execute("INSTALL sqlite")
+            duck.execute("LOAD sqlite")
+            database_path = self.database_path.replace("'", "''")
+            duck.execute(f"ATTACH '{database_path}' AS src (TYPE SQLITE, READ_ONLY)")
+            rows = duck.execute(self._duckdb_scoring_sql()).fetchall()
+        finally:
+            duck.close()
+        
+        scoring_date = datetime.now().isoformat()
+        self.conn.executemany(INSERT_LEAD_SCORE_SQL, (
+            (lead_id, company_name, total, *components, scoring_date, "1.0")
+            for lead_id, company_name, total, *components in rows
+        ))
+        self.conn.commit()
+        self._performance_cache = None
         
         scored_leads = []
-        for lead_id in lead_ids:
-            scores = self.score_lead(lead_id)
-            if scores:
-                scored_leads.append({
-                    'lead_id': lead_id,
-                    'scores': scores
-                })
+        for lead_id, _, total, *components in rows:
+            scores = dict(zip(SCORE_COMPONENTS, components))
+            scores['total'] = total
+            scored_leads.append({
+                'lead_id': lead_id,
+                'scores': scores
+            })
         
         return scored_leads
     
+    def _duckdb_scoring_sql(self) -> str:
+        """Express calculate_composite_score as a single DuckDB SELECT"""
+        criteria = self.criteria
+        min_range, max_range = criteria.ideal_employee_range
+        min_threshold = criteria.min_employee_threshold
+        
+        def literal_list(values) -> str:
+            return ', '.join("'" + value.replace("'", "''") + "'" for value in values)
+        
+        def contains_any(column: str, keywords: List[str]) -> str:
+            return ' OR '.join(f"contains({column}, '{keyword}')" for keyword in keywords)
+        
+        def mapped_sum(column: str, values: Dict[str, float]) -> str:
+            cases = ' '.join(
+                f"WHEN '{name}' THEN {value}" for name, value in values.items()
+            )
+            return (
+                f"COALESCE(list_sum(list_transform(from_json({column}, '[\"VARCHAR\"]'), "
+                f"x -> CASE x {cases} ELSE 0.0 END)), 0.0)"
+            )
+        
+        company_size = f'''CASE
+                WHEN COALESCE(l.employee_count, 0) = 0 THEN 0.3
+                WHEN l.employee_count < {min_threshold} THEN 0.2
+                WHEN l.employee_count < {min_range}
+                    THEN 0.2 + 0.8 * (l.employee_count - {min_threshold}) / {min_range - min_threshold}
+                WHEN l.employee_count <= {max_range} THEN 1.0
+                ELSE 0.6 * exp(-(l.employee_count - {max_range}) / 1000.0)
+            END'''
+        
+        industry = f'''CASE
+                WHEN COALESCE(l.industry, '') = '' THEN 0.5
+                WHEN lower(l.industry) IN ({literal_list(criteria.high_value_industries)}) THEN 1.0
+                WHEN lower(l.industry) IN ({literal_list(criteria.medium_value_industries)}) THEN 0.7
+                ELSE 0.4
+            END'''
+        
+        digital_maturity = f'''CASE
+                WHEN ci.id IS NULL THEN 0.5
+                WHEN COALESCE(ci.digital_maturity_score, 0.0) >= {criteria.high_maturity_threshold} THEN 1.0
+                WHEN COALESCE(ci.digital_maturity_score, 0.0) >= {criteria.medium_maturity_threshold} THEN 0.7
+                ELSE 0.4
+            END'''
+        
+        title = "lower(l.contact_title)"
+        contact_quality = f'''least(1.0,
+                CASE WHEN contains(l.contact_email, '@') AND contains(l.contact_email, '.')
+                    THEN 0.4 + CASE WHEN {contains_any('l.contact_email', ['gmail.com', 'yahoo.com', 'hotmail.com'])}
+                        THEN 0.0 ELSE 0.1 END
+                    ELSE 0.0 END
+                + CASE WHEN COALESCE(l.contact_name, '') <> '' THEN 0.2 ELSE 0.0 END
+                + CASE
+                    WHEN COALESCE(l.contact_title, '') = '' THEN 0.0
+                    WHEN {contains_any(title, ['ceo', 'founder', 'owner', 'president', 'director'])} THEN 0.3
+                    WHEN {contains_any(title, ['manager', 'head', 'lead'])} THEN 0.2
+                    ELSE 0.1
+                  END
+                + CASE WHEN COALESCE(l.phone, '') <> '' THEN 0.1 ELSE 0.0 END
+            )'''
+        
+        growth_indicators = (
+            f"least({mapped_sum('ci.growth_indicators', self.growth_indicator_values)} / 3.0, 1.0)"
+        )
+        pain_points = f"least({mapped_sum('ci.pain_points', self.pain_point_values)} / 2.0, 1.0)"
+        
+        weights = self.component_weights
+        return f'''
+            WITH components AS (
+                SELECT l.id AS lead_id, l.company_name,
+                    CAST({company_size} AS DOUBLE) AS company_size,
+                    CAST({industry} AS DOUBLE) AS industry,
+                    CAST({digital_maturity} AS DOUBLE) AS digital_maturity,
+                    CAST({contact_quality} AS DOUBLE) AS contact_quality,
+                    CAST({growth_indicators} AS DOUBLE) AS growth_indicators,
+                    CAST({pain_points} AS DOUBLE) AS pain_points
+                FROM src.leads l
+                LEFT JOIN src.company_intelligence ci
+                    ON ci.company_name = l.company_name AND ci.website = l.website
+            )
+            SELECT lead_id, company_name,
+                company_size * {weights[0]} + industry * {weights[1]}
+                    + digital_maturity * {weights[2]} + contact_quality * {weights[3]}
+                    + growth_indicators * {weights[4]} + pain_points * {weights[5]} AS total_score,
+                company_size, industry, digital_maturity,
+                contact_quality, growth_indicators, pain_points
+            FROM components
+            ORDER BY lead_id
+        '''
+    
     def get_top_scored_leads(self, limit: int = 20, min_score: float = 0.6) -> List[Dict]:
         """Get top-scored leads for outreach"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             SELECT l.*, ls.total_score, ls.company_size_score, ls.industry_score,
@@ -376,13 +717,11 @@ class LeadScoringAgent:
         columns = [desc[0] for desc in cursor.description]
         leads = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        conn.close()
         return leads
     
     def analyze_scoring_performance(self) -> Dict[str, float]:
         """Analyze scoring performance and accuracy"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Get scoring statistics
         cursor.execute('''
@@ -406,7 +745,6 @@ class LeadScoringAgent:
         ''')
         
         distribution = cursor.fetchone()
-        conn.close()
         
         if stats[3] > 0:  # total_leads > 0
             return {
@@ -431,8 +769,7 @@ class LeadScoringAgent:
     
     def record_outcome_feedback(self, lead_id: int, outcome: str, notes: str = ""):
         """Record actual outcome for machine learning improvement"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Get the predicted score
         cursor.execute('SELECT total_score FROM lead_scores WHERE lead_id = ?', (lead_id,))
@@ -445,36 +782,22 @@ class LeadScoringAgent:
             ) VALUES (?, ?, ?, ?, ?)
         ''', (lead_id, predicted_score, outcome, datetime.now().isoformat(), notes))
         
-        conn.commit()
-        conn.close()
+        self.conn.commit()
+    
+    def get_scoring_performance(self) -> Dict[str, float]:
+        """analyze_scoring_performance, recomputed at most once per minute"""
+        bucket = int(time.time() // PERFORMANCE_CACHE_SECONDS)
+        if self._performance_cache is None or self._performance_cache[0] != bucket:
+            self._performance_cache = (bucket, self.analyze_scoring_performance())
+        return self._performance_cache[1]
     
     def generate_scoring_report(self) -> str:
         """Generate a comprehensive scoring report"""
-        performance = self.analyze_scoring_performance()
-        
-        report = f"""
-LEAD SCORING PERFORMANCE REPORT
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-OVERALL STATISTICS:
-- Total Leads Scored: {performance['total_leads']}
-- Average Score: {performance['average_score']:.3f}
-- Score Range: {performance['min_score']:.3f} - {performance['max_score']:.3f}
-
-SCORE DISTRIBUTION:
-- High Score (≥0.8): {performance['high_score_percentage']:.1f}%
-- Medium Score (0.6-0.8): {performance['medium_score_percentage']:.1f}%
-- Low Score (<0.6): {performance['low_score_percentage']:.1f}%
-
-SCORING CRITERIA WEIGHTS:
-- Company Size: {self.criteria.company_size_weight:.1%}
-- Industry Relevance: {self.criteria.industry_relevance_weight:.1%}
-- Digital Maturity: {self.criteria.digital_maturity_weight:.1%}
-- Contact Quality: {self.criteria.contact_quality_weight:.1%}
-- Growth Indicators: {self.criteria.growth_indicators_weight:.1%}
-- Pain Points: {self.criteria.pain_points_weight:.1%}
-"""
-        return report
+        return SCORING_REPORT_TEMPLATE.format_map({
+            **self.get_scoring_performance(),
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'criteria_weights': CRITERIA_REPORT_TEMPLATE.format_map(vars(self.criteria))
+        })
 
 
 def main():
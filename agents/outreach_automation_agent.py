@@ -3,19 +3,86 @@ Outreach Automation Agent - Multi-channel automated outreach system
 This agent handles email, social media, and phone outreach with personalization
 """
 
+import asyncio
 import sqlite3
 import json
-import openai
-import smtplib
 import time
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
+from types import MappingProxyType
 import re
 import random
+import string
+import secrets
+import numpy as np
+
+
+# Upsert keyed on idx_outreach_tracking: status transitions update the
+# existing row in place instead of deleting and re-inserting it
+INSERT_OUTREACH_SQL = '''
+    INSERT INTO outreach_messages (
+        lead_id, channel, template_name, subject, message,
+        recipient_email, recipient_name, status, sent_date,
+        response_date, response_content, tracking_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tracking_id) DO UPDATE SET
+        status = excluded.status,
+        sent_date = excluded.sent_date,
+        response_date = excluded.response_date,
+        response_content = excluded.response_content
+'''
+
+
+# company_intelligence columns read by personalization, aliased with a ci_ prefix
+INTELLIGENCE_FIELDS = ('id', 'industry', 'technologies_used', 'pain_points', 'growth_indicators')
+INTELLIGENCE_JSON_FIELDS = ('technologies_used', 'pain_points', 'growth_indicators')
+
+# Personalization fields derived from each JSON-encoded intelligence column
+INTELLIGENCE_JSON_DEPENDENTS = {
+    'technologies_used': frozenset({'company_specific_detail'}),
+    'pain_points': frozenset({'pain_point_observation', 'metric', 'service_type'}),
+    'growth_indicators': frozenset({'specific_opportunity'})
+}
+
+# Option pools for the randomized personalization fields
+COMPANY_DETAILS = (
+    "your strong online presence",
+    "your innovative approach to the industry",
+    "your company's growth trajectory",
+    "your focus on customer experience",
+    "your market positioning"
+)
+PS_OPTIONS = (
+    "I recently helped a similar company increase their ROI by 60%.",
+    "I have some insights specific to your industry that might interest you.",
+    "I'd love to share a case study that's directly relevant to your situation.",
+    "I have some ideas that could help you stand out from competitors."
+)
+TIMEFRAMES = ('3 months', '6 months', '4 months')
+
+# Personalization used when a lead has no company intelligence
+_DEFAULT_PERSONALIZATION = MappingProxyType({
+    'company_specific_detail': 'your innovative approach to business',
+    'specific_benefit': 'increase their online presence and generate more qualified leads',
+    'pain_point_observation': 'there might be opportunities to optimize your digital marketing strategy',
+    'personalized_ps': 'I\'d love to share some industry insights that could be valuable.',
+    'similar_company': 'a similar company',
+    'metric': 'lead generation',
+    'percentage': '45',
+    'timeframe': '4 months',
+    'specific_reason': 'your industry focus',
+    'value_proposition': 'proven digital marketing strategies',
+    'service_type': 'digital marketing',
+    'specific_opportunity': 'your growth potential',
+    'specific_goal': 'achieve your marketing objectives',
+    'specific_observation': 'some interesting growth opportunities'
+})
 
 
 class OutreachChannel(Enum):
@@ -39,6 +106,11 @@ class OutreachStatus(Enum):
     FAILED = "failed"
 
 
+# Enum member -> stored string, so batched writes skip the Enum .value lookup
+_CHANNEL_STR = {channel: channel.value for channel in OutreachChannel}
+_STATUS_STR = {status: status.value for status in OutreachStatus}
+
+
 @dataclass
 class OutreachTemplate:
     """Template for outreach messages"""
@@ -54,6 +126,37 @@ class OutreachTemplate:
             self.follow_up_templates = []
         if self.personalization_fields is None:
             self.personalization_fields = []
+        
+        # Parse the static format strings once; rendering just joins the parts
+        self._subject_parts = tuple(string.Formatter().parse(self.subject_template))
+        self._message_parts = tuple(string.Formatter().parse(self.message_template))
+        
+        # Placeholders actually used, so callers only compute these fields
+        self.fields = frozenset(
+            field for _, field, _, _ in self._subject_parts + self._message_parts if field
+        )
+        
+        # JSON intelligence columns this template reads; the rest need not be decoded
+        self.intel_json_fields = tuple(
+            column for column, dependents in INTELLIGENCE_JSON_DEPENDENTS.items() if dependents & self.fields
+        )
+    
+    @staticmethod
+    def _render(parts: Tuple, data: Dict) -> str:
+        # Missing fields are left as their {placeholder} rather than raising
+        return "".join(
+            literal if field is None
+            else literal + (format(data[field], spec) if field in data else '{' + field + '}')
+            for literal, field, spec, _ in parts
+        )
+    
+    def render_subject(self, data: Dict) -> str:
+        """Render the subject template with named personalization fields"""
+        return self._render(self._subject_parts, data)
+    
+    def render_message(self, data: Dict) -> str:
+        """Render the message template with named personalization fields"""
+        return self._render(self._message_parts, data)
 
 
 @dataclass
@@ -74,7 +177,133 @@ class OutreachMessage:
     
     def __post_init__(self):
         if not self.tracking_id:
-            self.tracking_id = f"msg_{self.lead_id}_{int(time.time())}"
+            self.tracking_id = f"msg_{self.lead_id}_{secrets.token_hex(6)}"
+
+
+class SMTPConnectionPool:
+    """
+    Pool of logged-in SMTP sessions so the TLS handshake and AUTH are paid
+    once per connection instead of once per message
+    """
+    
+    def __init__(self, size: int, config: Dict, max_messages_per_connection: int = 100):
+        self.size = size
+        self.config = config
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = queue.Queue()
+        self._message_counts = {}
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> 'smtplib.SMTP':
+        """Open and authenticate a new SMTP session"""
+        import smtplib
+        
+        if self.config['smtp_port'] == 465:
+            conn = smtplib.SMTP_SSL(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+        else:
+            conn = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+            conn.starttls()
+        conn.login(self.config['email'], self.config['password'])
+        with self._lock:
+            self._message_counts[id(conn)] = 0
+        return conn
+    
+    def acquire(self) -> 'smtplib.SMTP':
+        """Take an idle session, opening a new one while the pool is below size"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+            if conn is not None:
+                return conn
+            
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                break
+            
+            # Wait for a session to come back; None means a discard freed a slot
+            conn = self._idle.get()
+            if conn is not None:
+                return conn
+        
+        try:
+            return self._connect()
+        except Exception:
+            self._free_slot()
+            raise
+    
+    def release(self, conn: 'smtplib.SMTP'):
+        """Return a session, rotating it once it hits the per-connection message cap"""
+        with self._lock:
+            exhausted = self._message_counts.get(id(conn), 0) >= self.max_messages_per_connection
+        if exhausted:
+            self.discard(conn)
+        else:
+            self._idle.put(conn)
+    
+    def discard(self, conn: 'smtplib.SMTP'):
+        """Drop a session from the pool and wake a waiter to open a replacement"""
+        self._quit(conn)
+        self._free_slot()
+    
+    def _free_slot(self):
+        """Give back a session slot and wake one blocked acquire"""
+        with self._lock:
+            self._created -= 1
+        self._idle.put(None)
+    
+    def _quit(self, conn: 'smtplib.SMTP'):
+        """Log out of a session, ignoring one that already hung up"""
+        import smtplib
+        
+        with self._lock:
+            self._message_counts.pop(id(conn), None)
+        try:
+            conn.quit()
+        except smtplib.SMTPException:
+            pass
+        except OSError:
+            pass
+    
+    def send_message(self, msg) -> None:
+        """Send a message on a pooled session, reconnecting once if the server hung up"""
+        import smtplib
+        
+        conn = self.acquire()
+        try:
+            conn.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.discard(conn)
+            conn = self.acquire()
+            try:
+                conn.send_message(msg)
+            except Exception:
+                self.discard(conn)
+                raise
+        except Exception:
+            self.discard(conn)
+            raise
+        
+        with self._lock:
+            self._message_counts[id(conn)] = self._message_counts.get(id(conn), 0) + 1
+        self.release(conn)
+    
+    def close(self):
+        """Close every idle session"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                self._quit(conn)
+                with self._lock:
+                    self._created -= 1
 
 
 class OutreachAutomationAgent:
@@ -84,10 +313,46 @@ class OutreachAutomationAgent:
     
     def __init__(self, database_path: str = "leads.db"):
         self.database_path = database_path
+        
+        # Long-lived autocommit connection so PRAGMA settings and SQLite's
+        # statement cache persist; multi-row writes open explicit transactions
+        self._conn = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        self._lead_cols = ()
+        self._rng = np.random.default_rng()
         self.setup_database()
         
-        # Initialize OpenAI client
-        self.openai_client = openai.OpenAI()
+        # Intelligence-driven personalization field -> generator(intelligence_data, draws)
+        self._intel_field_funcs = {
+            'company_specific_detail': lambda intel, draws: self.generate_company_specific_detail(
+                intel, draws['company_specific_detail']
+            ),
+            'specific_benefit': lambda intel, draws: self.generate_specific_benefit(intel),
+            'pain_point_observation': lambda intel, draws: self.generate_pain_point_observation(intel),
+            'personalized_ps': lambda intel, draws: self.generate_personalized_ps(intel, draws['personalized_ps']),
+            'similar_company': lambda intel, draws: self.get_similar_company(intel),
+            'metric': lambda intel, draws: self.get_relevant_metric(intel),
+            'percentage': lambda intel, draws: draws['percentage'],
+            'timeframe': lambda intel, draws: draws['timeframe'],
+            'specific_reason': lambda intel, draws: self.generate_specific_reason(intel),
+            'value_proposition': lambda intel, draws: self.generate_value_proposition(intel),
+            'service_type': lambda intel, draws: self.get_relevant_service_type(intel),
+            'specific_opportunity': lambda intel, draws: self.generate_specific_opportunity(intel),
+            'specific_goal': lambda intel, draws: self.generate_specific_goal(intel),
+            'specific_observation': lambda intel, draws: self.generate_specific_observation(intel)
+        }
+        
+        # OpenAI clients are created on first use (see openai_client / openai_async)
+        self._openai_client = None
+        self._openai_async_client = None
+        
+        # LLM personalization is opt-in; the rule-based generators are the fallback
+        self.llm_config = {
+            'enabled': False,
+            'model': 'gpt-4.1-mini',
+            'max_concurrent_requests': 10
+        }
         
         # Email configuration (would be set from environment variables in production)
         self.email_config = {
@@ -95,7 +360,8 @@ class OutreachAutomationAgent:
             'smtp_port': 587,
             'email': 'your-agency@gmail.com',  # Replace with actual email
             'password': 'your-app-password',   # Replace with actual app password
-            'from_name': 'AI Marketing Agency'
+            'from_name': 'AI Marketing Agency',
+            'use_smtp': False                  # Simulate sends until credentials are set
         }
         
         # Initialize outreach templates
@@ -109,12 +375,56 @@ class OutreachAutomationAgent:
             'daily_send_limit': 50,
             'hourly_send_limit': 10
         }
+        
+        # Sliding-window send log (monotonic timestamps) for the hourly and daily limits
+        self._send_times = deque()
+        self._daily_send_times = deque()
+        self._throttle_lock = threading.Lock()
+        
+        # SMTP sessions are opened lazily on the first real send
+        self.smtp_pool = SMTPConnectionPool(
+            size=self.timing_config['hourly_send_limit'],
+            config=self.email_config
+        )
+        
+        # Blocking SMTP sends run on one worker per pooled session
+        self._send_executor = ThreadPoolExecutor(
+            max_workers=self.timing_config['hourly_send_limit'],
+            thread_name_prefix='outreach-send'
+        )
+    
+    @property
+    def openai_client(self):
+        """OpenAI client, imported and constructed on first access"""
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.OpenAI()
+        return self._openai_client
+    
+    @property
+    def openai_async(self):
+        """Async OpenAI client, imported and constructed on first access"""
+        if self._openai_async_client is None:
+            import openai
+            self._openai_async_client = openai.AsyncOpenAI()
+        return self._openai_async_client
+    
+    def close(self):
+        """Release the send workers, SMTP sessions and database connection"""
+        self._send_executor.shutdown(wait=True)
+        self.smtp_pool.close()
+        self._conn.close()
     
     def setup_database(self):
         """Initialize database tables for outreach data"""
-        conn = sqlite3.connect(self.database_path)
+        conn = self._conn
         cursor = conn.cursor()
         
+        # WAL with NORMAL sync drops the per-commit fsync of the rollback journal
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-20000')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS outreach_messages (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -134,6 +444,101 @@ class OutreachAutomationAgent:
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lead_id INTEGER,
+                template_name TEXT,
+                channel TEXT,
+                scheduled_for TEXT,
+                payload_json TEXT,
+                FOREIGN KEY (lead_id) REFERENCES leads (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scheduled_for ON scheduled_messages(scheduled_for)
+        ''')
+        
+        # Older databases may hold repeated second-resolution tracking ids; give
+        # all but the latest row a distinct id before the unique index is first built
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_outreach_tracking'"
+        )
+        if cursor.fetchone() is None:
+            cursor.execute('BEGIN')
+            cursor.execute('''
+                UPDATE outreach_messages SET tracking_id = tracking_id || '_' || id
+                WHERE id NOT IN (SELECT MAX(id) FROM outreach_messages GROUP BY tracking_id)
+            ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX idx_outreach_tracking ON outreach_messages(tracking_id)
+            ''')
+            cursor.execute('COMMIT')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_outreach_lead ON outreach_messages(lead_id, channel)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_outreach_channel_status ON outreach_messages(channel, status)
+        ''')
+        
+        # Per (channel, status) message counts, maintained by triggers so
+        # analytics never has to scan outreach_messages
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'outreach_counter_insert'"
+        )
+        counters_installed = cursor.fetchone() is not None
+        
+        cursor.execute('BEGIN')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outreach_counters (
+                channel TEXT NOT NULL,
+                status TEXT NOT NULL,
+                cnt INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (channel, status)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS outreach_counter_insert
+            AFTER INSERT ON outreach_messages
+            BEGIN
+                INSERT INTO outreach_counters (channel, status, cnt) VALUES (NEW.channel, NEW.status, 1)
+                ON CONFLICT(channel, status) DO UPDATE SET cnt = cnt + 1;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS outreach_counter_update
+            AFTER UPDATE OF channel, status ON outreach_messages
+            WHEN OLD.channel IS NOT NEW.channel OR OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE outreach_counters SET cnt = cnt - 1
+                WHERE channel = OLD.channel AND status = OLD.status;
+                INSERT INTO outreach_counters (channel, status, cnt) VALUES (NEW.channel, NEW.status, 1)
+                ON CONFLICT(channel, status) DO UPDATE SET cnt = cnt + 1;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS outreach_counter_delete
+            AFTER DELETE ON outreach_messages
+            BEGIN
+                UPDATE outreach_counters SET cnt = cnt - 1
+                WHERE channel = OLD.channel AND status = OLD.status;
+            END
+        ''')
+        
+        # Backfill only when the triggers are first installed; from then on they keep the counts current
+        if not counters_installed:
+            cursor.execute('DELETE FROM outreach_counters')
+            cursor.execute('''
+                INSERT INTO outreach_counters (channel, status, cnt)
+                SELECT channel, status, COUNT(*) FROM outreach_messages
+                WHERE channel IS NOT NULL AND status IS NOT NULL
+                GROUP BY channel, status
+            ''')
+        cursor.execute('COMMIT')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS outreach_campaigns (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -164,8 +569,15 @@ class OutreachAutomationAgent:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        self.get_lead_columns()
+    
+    def get_lead_columns(self) -> Tuple[str, ...]:
+        """Column names of the leads table, read once and cached"""
+        if not self._lead_cols:
+            with self._db_lock:
+                rows = self._conn.execute('PRAGMA table_info(leads)').fetchall()
+            self._lead_cols = tuple(row[1] for row in rows)
+        return self._lead_cols
     
     def initialize_templates(self) -> Dict[str, OutreachTemplate]:
         """Initialize outreach message templates"""
@@ -260,8 +672,97 @@ Best,
         
         return templates
     
-    def personalize_message(self, template: OutreachTemplate, lead_data: Dict, intelligence_data: Dict = None) -> Tuple[str, str]:
-        """Personalize message template with lead-specific data"""
+    def _precompute_random_fields(self, n: int) -> Dict[str, np.ndarray]:
+        """Draw the randomized personalization fields for n leads at once"""
+        return {
+            'percentage': self._rng.integers(25, 86, n),
+            'timeframe': self._rng.choice(TIMEFRAMES, n),
+            'company_specific_detail': self._rng.choice(COMPANY_DETAILS, n),
+            'personalized_ps': self._rng.choice(PS_OPTIONS, n)
+        }
+    
+    @staticmethod
+    def _random_fields_for(random_fields: Dict[str, np.ndarray], index: int) -> Dict[str, str]:
+        """One lead's slice of _precompute_random_fields"""
+        return {name: str(values[index]) for name, values in random_fields.items()}
+    
+    def _rule_based_fields(self, intelligence_data: Dict, fields, draws: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Compute intelligence-driven personalization fields with the rule-based generators"""
+        if draws is None:
+            draws = {
+                'percentage': str(random.randint(25, 85)),
+                'timeframe': random.choice(TIMEFRAMES),
+                'company_specific_detail': random.choice(COMPANY_DETAILS),
+                'personalized_ps': random.choice(PS_OPTIONS)
+            }
+        generated = {}
+        for field in fields:
+            generate = self._intel_field_funcs.get(field)
+            if generate:
+                generated[field] = generate(intelligence_data, draws)
+        return generated
+    
+    async def generate_personalization_fields(self, intelligence_data: Dict, fields,
+                                              draws: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Generate personalization fields for one company, from the LLM when enabled"""
+        fields = [field for field in fields if field in self._intel_field_funcs]
+        generated = {}
+        
+        if self.llm_config['enabled'] and fields:
+            prompt = f"""
+            Write short personalization snippets for a cold outreach message to this company.
+            
+            Company intelligence: {json.dumps(intelligence_data, default=str)}
+            
+            Return a JSON object with exactly these string keys: {', '.join(fields)}.
+            Each value must read naturally when inserted mid-sentence.
+            """
+            try:
+                response = await self.openai_async.chat.completions.create(
+                    model=self.llm_config['model'],
+                    messages=[
+                        {"role": "system", "content": "You are an expert B2B outreach copywriter. Respond only with JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.7
+                )
+                content = json.loads(response.choices[0].message.content)
+                generated = {field: str(content[field]) for field in fields if content.get(field)}
+            except Exception as e:
+                print(f"Error generating personalization fields: {str(e)}")
+        
+        # Anything the LLM did not supply comes from the rule-based generators
+        missing = [field for field in fields if field not in generated]
+        generated.update(self._rule_based_fields(intelligence_data, missing, draws))
+        return generated
+    
+    async def generate_personalization_fields_batch(self, intelligence_list: List[Optional[Dict]], fields,
+                                                    draws_list: Optional[List[Dict[str, str]]] = None) -> List[Optional[Dict[str, str]]]:
+        """Generate personalization fields for many companies concurrently"""
+        semaphore = asyncio.Semaphore(self.llm_config['max_concurrent_requests'])
+        
+        async def generate(intelligence_data, draws):
+            if not intelligence_data:
+                return None
+            async with semaphore:
+                return await self.generate_personalization_fields(intelligence_data, fields, draws)
+        
+        if draws_list is None:
+            draws_list = [None] * len(intelligence_list)
+        return await asyncio.gather(*(
+            generate(intelligence_data, draws) for intelligence_data, draws in zip(intelligence_list, draws_list)
+        ))
+    
+    def personalize_message(self, template: OutreachTemplate, lead_data: Dict, intelligence_data: Dict = None,
+                            draws: Optional[Dict[str, str]] = None,
+                            generated_fields: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+        """
+        Personalize message template with lead-specific data. draws holds
+        pre-drawn random fields (see _precompute_random_fields); without it
+        the random fields are drawn per call. generated_fields holds fields
+        already produced by generate_personalization_fields.
+        """
         
         # Prepare personalization data
         personalization_data = {
@@ -273,64 +774,35 @@ Best,
             'agency_name': 'AI Marketing Solutions'
         }
         
+        # Only the fields this template references are computed
+        needed = template.fields - personalization_data.keys()
+        
         # Add intelligence-based personalization
         if intelligence_data:
-            personalization_data.update({
-                'company_specific_detail': self.generate_company_specific_detail(intelligence_data),
-                'specific_benefit': self.generate_specific_benefit(intelligence_data),
-                'pain_point_observation': self.generate_pain_point_observation(intelligence_data),
-                'personalized_ps': self.generate_personalized_ps(intelligence_data),
-                'similar_company': self.get_similar_company(intelligence_data),
-                'metric': self.get_relevant_metric(intelligence_data),
-                'percentage': str(random.randint(25, 85)),
-                'timeframe': random.choice(['3 months', '6 months', '4 months']),
-                'specific_reason': self.generate_specific_reason(intelligence_data),
-                'value_proposition': self.generate_value_proposition(intelligence_data),
-                'service_type': self.get_relevant_service_type(intelligence_data),
-                'specific_opportunity': self.generate_specific_opportunity(intelligence_data),
-                'specific_goal': self.generate_specific_goal(intelligence_data),
-                'specific_observation': self.generate_specific_observation(intelligence_data)
-            })
+            if generated_fields:
+                for field in needed & generated_fields.keys():
+                    personalization_data[field] = generated_fields[field]
+                needed = needed - generated_fields.keys()
+            if needed:
+                personalization_data.update(self._rule_based_fields(intelligence_data, needed, draws))
         else:
             # Default personalization when no intelligence data
-            personalization_data.update({
-                'company_specific_detail': 'your innovative approach to business',
-                'specific_benefit': 'increase their online presence and generate more qualified leads',
-                'pain_point_observation': 'there might be opportunities to optimize your digital marketing strategy',
-                'personalized_ps': 'I\'d love to share some industry insights that could be valuable.',
-                'similar_company': 'a similar company',
-                'metric': 'lead generation',
-                'percentage': '45',
-                'timeframe': '4 months',
-                'specific_reason': 'your industry focus',
-                'value_proposition': 'proven digital marketing strategies',
-                'service_type': 'digital marketing',
-                'specific_opportunity': 'your growth potential',
-                'specific_goal': 'achieve your marketing objectives',
-                'specific_observation': 'some interesting growth opportunities'
-            })
+            for field in needed & _DEFAULT_PERSONALIZATION.keys():
+                personalization_data[field] = _DEFAULT_PERSONALIZATION[field]
         
         # Personalize subject and message
-        subject = template.subject_template.format(**personalization_data)
-        message = template.message_template.format(**personalization_data)
+        subject = template.render_subject(personalization_data)
+        message = template.render_message(personalization_data)
         
         return subject, message
     
-    def generate_company_specific_detail(self, intelligence_data: Dict) -> str:
+    def generate_company_specific_detail(self, intelligence_data: Dict, detail: Optional[str] = None) -> str:
         """Generate company-specific detail for personalization"""
-        details = [
-            "your strong online presence",
-            "your innovative approach to the industry",
-            "your company's growth trajectory",
-            "your focus on customer experience",
-            "your market positioning"
-        ]
-        
         # Use intelligence data to make it more specific
         if intelligence_data.get('technologies_used'):
             return f"your use of modern technologies like {intelligence_data['technologies_used'][0]}"
         
-        return random.choice(details)
+        return detail or random.choice(COMPANY_DETAILS)
     
     def generate_specific_benefit(self, intelligence_data: Dict) -> str:
         """Generate specific benefit based on intelligence"""
@@ -359,16 +831,9 @@ Best,
         else:
             return "there are opportunities to optimize your digital marketing strategy"
     
-    def generate_personalized_ps(self, intelligence_data: Dict) -> str:
+    def generate_personalized_ps(self, intelligence_data: Dict, ps: Optional[str] = None) -> str:
         """Generate personalized P.S. based on intelligence"""
-        ps_options = [
-            "I recently helped a similar company increase their ROI by 60%.",
-            "I have some insights specific to your industry that might interest you.",
-            "I'd love to share a case study that's directly relevant to your situation.",
-            "I have some ideas that could help you stand out from competitors."
-        ]
-        
-        return random.choice(ps_options)
+        return ps or random.choice(PS_OPTIONS)
     
     def get_similar_company(self, intelligence_data: Dict) -> str:
         """Get similar company name for case studies"""
@@ -446,43 +911,61 @@ Best,
         """Generate specific observation for LinkedIn"""
         return f"some interesting opportunities in the {intelligence_data.get('industry', 'business')} space"
     
-    def create_outreach_message(self, lead_id: int, template_name: str, channel: OutreachChannel) -> Optional[OutreachMessage]:
-        """Create personalized outreach message for a lead"""
-        
-        # Get lead data
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM leads WHERE id = ?', (lead_id,))
-        lead_row = cursor.fetchone()
-        
-        if not lead_row:
-            conn.close()
-            return None
-        
-        lead_columns = [desc[0] for desc in cursor.description]
-        lead_data = dict(zip(lead_columns, lead_row))
-        
-        # Get intelligence data
-        cursor.execute('''
-            SELECT * FROM company_intelligence 
-            WHERE company_name = ? AND website = ?
-        ''', (lead_data['company_name'], lead_data['website']))
-        
-        intelligence_row = cursor.fetchone()
-        intelligence_data = None
+    def _intel_json_fields_for(self, template_names) -> Tuple[str, ...]:
+        """JSON intelligence columns the given templates need decoded"""
+        if self.llm_config['enabled']:
+            return INTELLIGENCE_JSON_FIELDS
+        needed = set()
+        for template_name in template_names:
+            template = self.templates.get(template_name)
+            if template:
+                needed.update(template.intel_json_fields)
+        return tuple(field for field in INTELLIGENCE_JSON_FIELDS if field in needed)
+    
+    def _fetch_leads_with_intel(self, lead_ids: List[int],
+                                json_fields: Tuple[str, ...] = INTELLIGENCE_JSON_FIELDS) -> Dict[int, Tuple[Dict, Optional[Dict]]]:
+        """
+        Fetch leads joined with their company intelligence, keyed by lead id.
+        Only json_fields are decoded; other JSON columns stay as raw text.
+        """
+        leads = {}
+        lead_cols = self.get_lead_columns()
+        n_lead_cols = len(lead_cols)
+        intel_select = ', '.join(f'ci.{field} AS ci_{field}' for field in INTELLIGENCE_FIELDS)
         
-        if intelligence_row:
-            intelligence_columns = [desc[0] for desc in cursor.description]
-            intelligence_data = dict(zip(intelligence_columns, intelligence_row))
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(lead_ids), 500):
+            chunk = lead_ids[start:start + 500]
+            with self._db_lock:
+                rows = self._conn.execute(f'''
+                    SELECT l.*, {intel_select}
+                    FROM leads l
+                    LEFT JOIN company_intelligence ci
+                        ON ci.company_name = l.company_name AND ci.website = l.website
+                    WHERE l.id IN ({','.join('?' * len(chunk))})
+                ''', chunk).fetchall()
             
-            # Parse JSON fields
-            if intelligence_data.get('pain_points'):
-                intelligence_data['pain_points'] = json.loads(intelligence_data['pain_points'])
-            if intelligence_data.get('growth_indicators'):
-                intelligence_data['growth_indicators'] = json.loads(intelligence_data['growth_indicators'])
+            for row in rows:
+                lead_data = dict(zip(lead_cols, row))
+                intelligence_data = None
+                
+                if row[n_lead_cols] is not None:
+                    intelligence_data = dict(zip(INTELLIGENCE_FIELDS, row[n_lead_cols:]))
+                    
+                    # Parse JSON fields
+                    for field in json_fields:
+                        if intelligence_data[field]:
+                            intelligence_data[field] = json.loads(intelligence_data[field])
+                
+                leads[lead_data['id']] = (lead_data, intelligence_data)
         
-        conn.close()
+        return leads
+    
+    def create_outreach_message(self, lead_data: Dict, intelligence_data: Optional[Dict],
+                                template_name: str, channel: OutreachChannel,
+                                draws: Optional[Dict[str, str]] = None,
+                                generated_fields: Optional[Dict[str, str]] = None) -> Optional[OutreachMessage]:
+        """Create personalized outreach message for a lead"""
         
         # Get template
         template = self.templates.get(template_name)
@@ -490,11 +973,11 @@ Best,
             return None
         
         # Personalize message
-        subject, message = self.personalize_message(template, lead_data, intelligence_data)
+        subject, message = self.personalize_message(template, lead_data, intelligence_data, draws, generated_fields)
         
         # Create outreach message
         outreach_message = OutreachMessage(
-            lead_id=lead_id,
+            lead_id=lead_data['id'],
             channel=channel,
             template_name=template_name,
             subject=subject,
@@ -505,78 +988,142 @@ Best,
         
         return outreach_message
     
-    def send_email(self, message: OutreachMessage) -> bool:
+    def _reserve_send_slot(self) -> float:
+        """Claim the next send slot allowed by the hourly/daily limits and return the wait in seconds"""
+        with self._throttle_lock:
+            now = time.monotonic()
+            while self._send_times and now - self._send_times[0] >= 3600:
+                self._send_times.popleft()
+            while self._daily_send_times and now - self._daily_send_times[0] >= 86400:
+                self._daily_send_times.popleft()
+            
+            send_at = now
+            if len(self._send_times) >= self.timing_config['hourly_send_limit']:
+                send_at = max(send_at, self._send_times[-self.timing_config['hourly_send_limit']] + 3600)
+            if len(self._daily_send_times) >= self.timing_config['daily_send_limit']:
+                send_at = max(send_at, self._daily_send_times[-self.timing_config['daily_send_limit']] + 86400)
+            
+            self._send_times.append(send_at)
+            self._daily_send_times.append(send_at)
+            return send_at - now
+    
+    async def _throttle(self):
+        """Wait only when the next send would exceed the send limits"""
+        delay = self._reserve_send_slot()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def send_email(self, message: OutreachMessage, save: bool = True) -> bool:
         """Send email message (simulation for demo)"""
+        return asyncio.run(self.send_email_async(message, save))
+    
+    async def send_email_async(self, message: OutreachMessage, save: bool = True) -> bool:
+        """Send email message without blocking the event loop (simulation for demo)"""
+        await self._throttle()
         try:
-            # In production, this would use actual SMTP
-            print(f"[EMAIL SIMULATION] Sending to {message.recipient_email}")
-            print(f"Subject: {message.subject}")
-            print(f"Message: {message.message[:100]}...")
-            
-            # Simulate sending
-            time.sleep(1)
+            if self.email_config['use_smtp']:
+                # Pooled sessions are blocking, so send from the bounded send executor
+                await asyncio.get_running_loop().run_in_executor(
+                    self._send_executor, self.smtp_pool.send_message, self.build_email(message)
+                )
+            else:
+                print(f"[EMAIL SIMULATION] Sending to {message.recipient_email}")
+                print(f"Subject: {message.subject}")
+                print(f"Message: {message.message[:100]}...")
+                
+                # Simulate sending
+                await asyncio.sleep(1)
             
             # Update message status
             message.status = OutreachStatus.SENT
             message.sent_date = datetime.now()
             
             # Save to database
-            self.save_outreach_message(message)
+            if save:
+                self.save_outreach_message(message)
             
             return True
             
         except Exception as e:
             print(f"Error sending email: {str(e)}")
             message.status = OutreachStatus.FAILED
-            self.save_outreach_message(message)
+            if save:
+                self.save_outreach_message(message)
             return False
     
-    def send_linkedin_message(self, message: OutreachMessage) -> bool:
+    def build_email(self, message: OutreachMessage) -> 'MIMEMultipart':
+        """Build the MIME email for an outreach message"""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        
+        email = MIMEMultipart()
+        email['From'] = f"{self.email_config['from_name']} <{self.email_config['email']}>"
+        email['To'] = message.recipient_email
+        email['Subject'] = message.subject
+        email.attach(MIMEText(message.message, 'plain'))
+        return email
+    
+    def send_linkedin_message(self, message: OutreachMessage, save: bool = True) -> bool:
         """Send LinkedIn message (simulation for demo)"""
+        return asyncio.run(self.send_linkedin_message_async(message, save))
+    
+    async def send_linkedin_message_async(self, message: OutreachMessage, save: bool = True) -> bool:
+        """Send LinkedIn message without blocking the event loop (simulation for demo)"""
+        await self._throttle()
         try:
             print(f"[LINKEDIN SIMULATION] Sending to {message.recipient_name}")
             print(f"Message: {message.message[:100]}...")
             
             # Simulate sending
-            time.sleep(2)
+            await asyncio.sleep(2)
             
             message.status = OutreachStatus.SENT
             message.sent_date = datetime.now()
-            self.save_outreach_message(message)
+            if save:
+                self.save_outreach_message(message)
             
             return True
             
         except Exception as e:
             print(f"Error sending LinkedIn message: {str(e)}")
             message.status = OutreachStatus.FAILED
-            self.save_outreach_message(message)
+            if save:
+                self.save_outreach_message(message)
             return False
     
     def save_outreach_message(self, message: OutreachMessage):
         """Save outreach message to database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO outreach_messages (
-                lead_id, channel, template_name, subject, message,
-                recipient_email, recipient_name, status, sent_date,
-                response_date, response_content, tracking_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            message.lead_id, message.channel.value, message.template_name,
-            message.subject, message.message, message.recipient_email,
-            message.recipient_name, message.status.value,
-            message.sent_date.isoformat() if message.sent_date else None,
-            message.response_date.isoformat() if message.response_date else None,
-            message.response_content, message.tracking_id
-        ))
+        self.save_outreach_messages_batch([message])
+    
+    def save_outreach_messages_batch(self, messages: List[OutreachMessage]):
+        """Save outreach messages in a single transaction"""
+        rows = (
+            (
+                message.lead_id, _CHANNEL_STR[message.channel], message.template_name,
+                message.subject, message.message, message.recipient_email,
+                message.recipient_name, _STATUS_STR[message.status],
+                message.sent_date.isoformat() if message.sent_date else None,
+                message.response_date.isoformat() if message.response_date else None,
+                message.response_content, message.tracking_id
+            )
+            for message in messages
+        )
         
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(INSERT_OUTREACH_SQL, rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
     
     def execute_outreach_campaign(self, qualified_leads: List[Dict]) -> Dict[str, int]:
         """Execute outreach campaign for qualified leads"""
+        return asyncio.run(self.execute_outreach_campaign_async(qualified_leads))
+    
+    async def execute_outreach_campaign_async(self, qualified_leads: List[Dict]) -> Dict[str, int]:
+        """Execute outreach campaign with concurrent sends, bounded by the hourly send limit"""
         results = {
             'total_leads': len(qualified_leads),
             'emails_sent': 0,
@@ -584,62 +1131,123 @@ Best,
             'failed': 0
         }
         
-        for lead in qualified_leads:
-            lead_id = lead['id']
+        semaphore = asyncio.Semaphore(self.timing_config['hourly_send_limit'])
+        lead_records = self._fetch_leads_with_intel(
+            [lead['id'] for lead in qualified_leads],
+            self._intel_json_fields_for(('initial_email', 'linkedin_connection'))
+        )
+        random_fields = self._precompute_random_fields(len(qualified_leads))
+        draws_list = [self._random_fields_for(random_fields, i) for i in range(len(qualified_leads))]
+        records = [lead_records.get(lead['id']) for lead in qualified_leads]
+        
+        # Personalization for every lead is generated concurrently, once per lead for both templates
+        fields = self.templates['initial_email'].fields | self.templates['linkedin_connection'].fields
+        generated = await self.generate_personalization_fields_batch(
+            [record[1] if record else None for record in records], fields, draws_list
+        )
+        
+        lead_outcomes = await asyncio.gather(*(
+            self._send_lead_outreach(lead, record, draws, semaphore, generated_fields)
+            for lead, record, draws, generated_fields in zip(qualified_leads, records, draws_list, generated)
+        ))
+        
+        # Messages are persisted together once every send has finished
+        sent_messages = []
+        for outcomes in lead_outcomes:
+            for message, sent in outcomes:
+                if not sent:
+                    results['failed'] += 1
+                elif message.channel == OutreachChannel.EMAIL:
+                    results['emails_sent'] += 1
+                else:
+                    results['linkedin_sent'] += 1
+                sent_messages.append(message)
+        
+        self.save_outreach_messages_batch(sent_messages)
+        
+        return results
+    
+    async def _send_lead_outreach(self, lead: Dict, record: Optional[Tuple[Dict, Optional[Dict]]],
+                                  draws: Dict[str, str], semaphore: asyncio.Semaphore,
+                                  generated_fields: Optional[Dict[str, str]] = None) -> List[Tuple[OutreachMessage, bool]]:
+        """Send the initial email and LinkedIn request for one lead concurrently"""
+        if record is None:
+            return []
+        lead_data, intelligence_data = record
+        
+        async with semaphore:
+            sends = []
             
             # Send initial email
-            email_message = self.create_outreach_message(lead_id, 'initial_email', OutreachChannel.EMAIL)
+            email_message = self.create_outreach_message(
+                lead_data, intelligence_data, 'initial_email', OutreachChannel.EMAIL, draws, generated_fields
+            )
             if email_message and email_message.recipient_email:
-                if self.send_email(email_message):
-                    results['emails_sent'] += 1
-                else:
-                    results['failed'] += 1
+                sends.append((email_message, self.send_email_async(email_message, save=False)))
             
             # Send LinkedIn connection request if we have contact name
             if lead.get('contact_name'):
-                linkedin_message = self.create_outreach_message(lead_id, 'linkedin_connection', OutreachChannel.LINKEDIN)
+                linkedin_message = self.create_outreach_message(
+                    lead_data, intelligence_data, 'linkedin_connection', OutreachChannel.LINKEDIN, draws, generated_fields
+                )
                 if linkedin_message:
-                    if self.send_linkedin_message(linkedin_message):
-                        results['linkedin_sent'] += 1
-                    else:
-                        results['failed'] += 1
+                    sends.append((linkedin_message, self.send_linkedin_message_async(linkedin_message, save=False)))
             
-            # Rate limiting
-            time.sleep(2)
-        
-        return results
+            outcomes = await asyncio.gather(*(send for _, send in sends))
+            
+            return [(message, sent) for (message, _), sent in zip(sends, outcomes)]
     
-    def schedule_follow_ups(self, lead_id: int):
+    def schedule_follow_ups(self, lead_id: int) -> int:
         """Schedule follow-up messages for a lead"""
+        return self.schedule_follow_ups_batch([lead_id])
+    
+    def schedule_follow_ups_batch(self, lead_ids: List[int]) -> int:
+        """Render follow-ups for many leads and store them in scheduled_messages in one transaction"""
         follow_up_templates = ['follow_up_1', 'follow_up_2']
+        delays = zip(follow_up_templates, self.timing_config['follow_up_delays_days'])
         
-        for i, template_name in enumerate(follow_up_templates):
-            # Calculate send date
-            delay_days = self.timing_config['follow_up_delays_days'][i]
-            send_date = datetime.now() + timedelta(days=delay_days)
-            
-            # Create follow-up message
-            message = self.create_outreach_message(lead_id, template_name, OutreachChannel.EMAIL)
-            if message:
-                # In production, this would be scheduled in a task queue
-                print(f"Scheduled {template_name} for lead {lead_id} on {send_date.strftime('%Y-%m-%d')}")
+        now = datetime.now()
+        schedule = [(template_name, (now + timedelta(days=days)).isoformat()) for template_name, days in delays]
+        
+        lead_records = self._fetch_leads_with_intel(list(lead_ids), self._intel_json_fields_for(follow_up_templates))
+        random_fields = self._precompute_random_fields(len(lead_records))
+        
+        rows = []
+        for i, (lead_id, (lead_data, intelligence_data)) in enumerate(lead_records.items()):
+            draws = self._random_fields_for(random_fields, i)
+            for template_name, scheduled_for in schedule:
+                message = self.create_outreach_message(
+                    lead_data, intelligence_data, template_name, OutreachChannel.EMAIL, draws
+                )
+                if message:
+                    rows.append((
+                        lead_id, template_name, _CHANNEL_STR[OutreachChannel.EMAIL], scheduled_for,
+                        json.dumps({'subject': message.subject, 'message': message.message})
+                    ))
+        
+        with self._db_lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('''
+                    INSERT INTO scheduled_messages (lead_id, template_name, channel, scheduled_for, payload_json)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        
+        return len(rows)
     
     def get_outreach_analytics(self) -> Dict[str, int]:
         """Get outreach performance analytics"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                channel,
-                status,
-                COUNT(*) as count
-            FROM outreach_messages
-            GROUP BY channel, status
-        ''')
-        
-        results = cursor.fetchall()
-        conn.close()
+        with self._db_lock:
+            results = self._conn.execute('''
+                SELECT channel, status, cnt
+                FROM outreach_counters
+                WHERE cnt > 0
+                ORDER BY channel, status
+            ''').fetchall()
         
         analytics = {}
         for channel, status, count in results:
@@ -653,19 +1261,18 @@ Best,
         """Generate outreach performance report"""
         analytics = self.get_outreach_analytics()
         
-        report = f"""
+        parts = [f"""
 OUTREACH PERFORMANCE REPORT
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 CHANNEL PERFORMANCE:
-"""
+"""]
         
         for channel, stats in analytics.items():
-            report += f"\n{channel.upper()}:\n"
-            for status, count in stats.items():
-                report += f"  - {status.title()}: {count}\n"
+            parts.append(f"\n{channel.upper()}:\n")
+            parts.extend(f"  - {status.title()}: {count}\n" for status, count in stats.items())
         
-        return report
+        return "".join(parts)
 
 
 def main():
@@ -682,7 +1289,7 @@ def main():
         LIMIT 3
     ''')
     
-    columns = [desc[0] for desc in cursor.description]
+    columns = agent.get_lead_columns()
     qualified_leads = [dict(zip(columns, row)) for row in cursor.fetchall()]
     conn.close()
     
@@ -701,8 +1308,8 @@ def main():
     print(f"- Failed: {results['failed']}")
     
     # Schedule follow-ups
-    for lead in qualified_leads:
-        agent.schedule_follow_ups(lead['id'])
+    scheduled = agent.schedule_follow_ups_batch([lead['id'] for lead in qualified_leads])
+    print(f"Scheduled {scheduled} follow-up messages")
     
     # Generate report
     report = agent.generate_outreach_report()
@@ -4,18 +4,96 @@ This agent performs comprehensive research on prospects to gather intelligence
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+import itertools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import sqlite3
+import threading
+import multiprocessing
 import re
 from urllib.parse import urljoin, urlparse
 import os
 
+try:
+    import orjson
+    
+    def _dumps(value) -> str:
+        return orjson.dumps(value).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# Research is stable for days, so fetched pages and profile probes are reused this long
+HTTP_CACHE_SECONDS = 86400
+
+
+# Bytes of each company page downloaded for analysis; the signals live in the first part of the page
+MAX_PAGE_BYTES = 65536
+
+# Page content keeps its original case, so these match case-insensitively.
+# The description <meta> tag may use either quote style, extra whitespace
+# and any attribute order; its content attribute is read separately.
+META_DESC_RE = re.compile(r'<meta\s[^>]*?\bname\s*=\s*["\']?description["\'\s/>][^>]*>', re.IGNORECASE)
+META_CONTENT_RE = re.compile(r'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+KEY_PAGES = ('about', 'services', 'products', 'contact', 'blog', 'news')
+# "/page" or "page.html" anywhere in the page; the lookahead keeps overlapping hits
+KEY_PAGE_RE = re.compile(r'(?=/({0})|({0})\.html)'.format('|'.join(KEY_PAGES)), re.IGNORECASE)
+
+PROSPECT_SUMMARY_TEMPLATE = """
+PROSPECT RESEARCH SUMMARY
+Company: {company_name}
+Website: {website}
+Industry: {industry}
+Digital Maturity Score: {digital_maturity_score:.2f}/1.0
+
+DESCRIPTION:
+{description}
 
-@dataclass
+TECHNOLOGIES USED:
+{technologies}
+
+SOCIAL MEDIA PRESENCE:
+{social_media}
+
+IDENTIFIED PAIN POINTS:
+{pain_points}
+
+GROWTH INDICATORS:
+{growth_indicators}
+
+RESEARCH DATE: {research_date:%Y-%m-%d}
+"""
+
+INSERT_INTELLIGENCE_SQL = '''
+    INSERT OR REPLACE INTO company_intelligence (
+        company_name, website, industry, description, founded_year,
+        headquarters, employee_count, revenue_range, funding_info,
+        key_personnel, competitors, technologies_used,
+        social_media_presence, recent_news, pain_points,
+        growth_indicators, digital_maturity_score, research_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+@dataclass(slots=True)
 class CompanyIntelligence:
     """Data structure for storing company intelligence"""
     company_name: str
@@ -26,36 +104,37 @@ class CompanyIntelligence:
     headquarters: str = ""
     employee_count: Optional[int] = None
     revenue_range: str = ""
-    funding_info: Dict = None
-    key_personnel: List[Dict] = None
-    competitors: List[str] = None
-    technologies_used: List[str] = None
-    social_media_presence: Dict[str, str] = None
-    recent_news: List[Dict] = None
-    pain_points: List[str] = None
-    growth_indicators: List[str] = None
+    funding_info: Dict = field(default_factory=dict)
+    key_personnel: List[Dict] = field(default_factory=list)
+    competitors: List[str] = field(default_factory=list)
+    technologies_used: List[str] = field(default_factory=list)
+    social_media_presence: Dict[str, str] = field(default_factory=dict)
+    recent_news: List[Dict] = field(default_factory=list)
+    pain_points: List[str] = field(default_factory=list)
+    growth_indicators: List[str] = field(default_factory=list)
     digital_maturity_score: float = 0.0
-    research_date: datetime = None
-    
-    def __post_init__(self):
-        if self.funding_info is None:
-            self.funding_info = {}
-        if self.key_personnel is None:
-            self.key_personnel = []
-        if self.competitors is None:
-            self.competitors = []
-        if self.technologies_used is None:
-            self.technologies_used = []
-        if self.social_media_presence is None:
-            self.social_media_presence = {}
-        if self.recent_news is None:
-            self.recent_news = []
-        if self.pain_points is None:
-            self.pain_points = []
-        if self.growth_indicators is None:
-            self.growth_indicators = []
-        if self.research_date is None:
-            self.research_date = datetime.now()
+    research_date: datetime = field(default_factory=datetime.now)
+
+
+class HostRateLimiter:
+    """Per-host token bucket: up to `rate` requests per second, bursting to `burst`"""
+    
+    def __init__(self, rate: float = 5.0, burst: int = 5):
+        self.interval = 1.0 / rate
+        self.burst_allowance = (burst - 1) * self.interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url: str):
+        """Block until a request to url's host is allowed"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            next_slot = max(self._next_slot.get(host, now), now)
+            start = max(now, next_slot - self.burst_allowance)
+            self._next_slot[host] = next_slot + self.interval
+        if start > now:
+            time.sleep(start - now)
 
 
 class ProspectResearchAgent:
@@ -63,14 +142,68 @@ class ProspectResearchAgent:
     AI-powered prospect research agent that gathers comprehensive intelligence
     """
     
-    def __init__(self, database_path: str = "leads.db"):
+    # Technology groups used by the maturity, growth and industry heuristics
+    _MODERN_TECH = frozenset({'react', 'angular', 'vue', 'next.js', 'shopify'})
+    _MATURITY_MARKETING_TOOLS = frozenset({'google analytics', 'hubspot', 'marketo', 'mailchimp'})
+    _MARKETING_AUTOMATION = frozenset({'hubspot', 'marketo', 'pardot', 'mailchimp'})
+    _ECOMMERCE_PLATFORMS = frozenset({'shopify', 'magento', 'woocommerce', 'bigcommerce'})
+    _ECOMMERCE_INDUSTRY_TECH = frozenset({'shopify', 'magento', 'woocommerce'})
+    
+    # Candidate profile URLs per platform, filled from find_social_media_profiles' slugs
+    _SOCIAL_TEMPLATES = {
+        'linkedin': ('linkedin.com/company/{slug}', 'linkedin.com/company/{hyphen}', 'linkedin.com/company/{domain}'),
+        'twitter': ('twitter.com/{slug}', 'twitter.com/{domain}', 'twitter.com/{nospace}'),
+        'facebook': ('facebook.com/{slug}', 'facebook.com/{domain}', 'facebook.com/{nospace}')
+    }
+    
+    # Description keywords for industry classification, checked in order
+    _INDUSTRY_KEYWORDS = (
+        ('technology', ('software', 'technology', 'app', 'platform', 'saas')),
+        ('professional_services', ('consulting', 'services', 'agency', 'firm')),
+        ('healthcare', ('health', 'medical', 'clinic', 'hospital'))
+    )
+    
+    def __init__(self, database_path: str = "leads.db", http_cache_path: Optional[str] = None):
         self.database_path = database_path
+        
+        # One autocommit connection shared by every call; writes use explicit transactions
+        self._conn = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._lock = threading.Lock()
         self.setup_database()
-        self.session = requests.Session()
+        
+        # Opt-in persistent HTTP cache (revalidated with ETag/Last-Modified) when requests-cache
+        # is installed. The cache stores whole response bodies, so on servers that ignore Range
+        # it downloads more than MAX_PAGE_BYTES per page
+        if requests_cache is not None and http_cache_path:
+            self.session = requests_cache.CachedSession(
+                http_cache_path,
+                backend='sqlite',
+                expire_after=HTTP_CACHE_SECONDS,
+                allowable_methods=('GET', 'HEAD'),
+                allowable_codes=(200, 206, 404),
+                stale_if_error=True
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
+        # Keep-alive pools sized for concurrent fetches (per host and across hosts)
+        self.max_workers = 32
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Politeness is per host, so leads on different domains never wait on each other
+        self.rate_limiter = HostRateLimiter(rate=5, burst=5)
+        
+        # Social profile probes run here; company-level research uses a per-batch pool
+        self._probe_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        
         # Research sources and patterns
         self.social_platforms = {
             'linkedin': 'linkedin.com/company/',
@@ -79,6 +212,10 @@ class ProspectResearchAgent:
             'instagram': 'instagram.com/'
         }
         
+        self._init_analyzer()
+    
+    def _init_analyzer(self):
+        """Keyword tables and patterns used by the CPU stage of research (_enrich)"""
         # Technology indicators for digital maturity assessment
         self.tech_indicators = {
             'modern_cms': ['wordpress', 'drupal', 'shopify', 'squarespace'],
@@ -97,59 +234,87 @@ class ProspectResearchAgent:
             'competition': ['competitive advantage', 'market share', 'differentiation'],
             'digital_presence': ['online presence', 'digital marketing', 'social media']
         }
+        
+        # Every keyword looked for in page content, longest first
+        self._keywords = tuple(sorted({
+            keyword
+            for group in (self.tech_indicators, self.pain_point_keywords)
+            for words in group.values()
+            for keyword in words
+        }, key=len, reverse=True))
+        self._max_keyword_len = len(self._keywords[0])
+        
+        # With re2 the whole set is one DFA pass; the stdlib backtracking
+        # engine is slower on this alternation than per-keyword substring search
+        self._keyword_re = None
+        if re2 is not None:
+            self._keyword_re = re2.compile('(?i)(' + '|'.join(re2.escape(keyword) for keyword in self._keywords) + ')')
+    
+    def close(self):
+        """Release the probe workers and the database connection"""
+        self._probe_executor.shutdown(wait=True)
+        self._conn.close()
     
     def setup_database(self):
         """Initialize database tables for storing research data"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS company_intelligence (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                company_name TEXT NOT NULL,
-                website TEXT,
-                industry TEXT,
-                description TEXT,
-                founded_year INTEGER,
-                headquarters TEXT,
-                employee_count INTEGER,
-                revenue_range TEXT,
-                funding_info TEXT,
-                key_personnel TEXT,
-                competitors TEXT,
-                technologies_used TEXT,
-                social_media_presence TEXT,
-                recent_news TEXT,
-                pain_points TEXT,
-                growth_indicators TEXT,
-                digital_maturity_score REAL,
-                research_date TEXT,
-                UNIQUE(company_name, website)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS company_intelligence (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    company_name TEXT NOT NULL,
+                    website TEXT,
+                    industry TEXT,
+                    description TEXT,
+                    founded_year INTEGER,
+                    headquarters TEXT,
+                    employee_count INTEGER,
+                    revenue_range TEXT,
+                    funding_info TEXT,
+                    key_personnel TEXT,
+                    competitors TEXT,
+                    technologies_used TEXT,
+                    social_media_presence TEXT,
+                    recent_news TEXT,
+                    pain_points TEXT,
+                    growth_indicators TEXT,
+                    digital_maturity_score REAL,
+                    research_date TEXT,
+                    UNIQUE(company_name, website)
+                )
+            ''')
     
     def research_company(self, company_name: str, website: str) -> CompanyIntelligence:
         """Conduct comprehensive research on a company"""
+        return self._enrich(self._fetch_raw(company_name, website))
+    
+    def _fetch_raw(self, company_name: str, website: str) -> Dict:
+        """Network stage of research: the page head and social profiles"""
         print(f"Researching {company_name}...")
         
+        return {
+            'company_name': company_name,
+            'website': website,
+            'content': self.fetch_website_content(website),
+            'social_media_presence': self.find_social_media_profiles(company_name, website)
+        }
+    
+    def _enrich(self, raw: Dict) -> CompanyIntelligence:
+        """CPU stage of research: analyze fetched data into intelligence"""
         intelligence = CompanyIntelligence(
-            company_name=company_name,
-            website=website,
+            company_name=raw['company_name'],
+            website=raw['website'],
             industry="",  # Will be determined during research
         )
         
         # Website analysis
-        website_data = self.analyze_company_website(website)
-        if website_data:
+        if raw['content'] is not None:
+            website_data = self.analyze_website_content(raw['content'])
             intelligence.description = website_data.get('description', '')
             intelligence.technologies_used = website_data.get('technologies', [])
             intelligence.pain_points = website_data.get('pain_points', [])
         
         # Social media research
-        intelligence.social_media_presence = self.find_social_media_profiles(company_name, website)
+        intelligence.social_media_presence = raw['social_media_presence']
         
         # Technology stack analysis
         intelligence.digital_maturity_score = self.assess_digital_maturity(intelligence)
@@ -164,92 +329,131 @@ class ProspectResearchAgent:
     
     def analyze_company_website(self, website: str) -> Optional[Dict]:
         """Analyze company website for insights"""
+        content = self.fetch_website_content(website)
+        if content is None:
+            return None
+        return self.analyze_website_content(content)
+    
+    def fetch_website_content(self, website: str) -> Optional[str]:
+        """Download the head of a company page"""
         try:
-            response = self.session.get(website, timeout=15)
-            if response.status_code != 200:
-                return None
-            
-            content = response.text.lower()
-            
-            analysis = {
-                'description': '',
-                'technologies': [],
-                'pain_points': [],
-                'contact_info': {},
-                'pages': []
-            }
-            
-            # Extract meta description
-            meta_desc_pattern = r'<meta name="description" content="([^"]*)"'
-            meta_match = re.search(meta_desc_pattern, content, re.IGNORECASE)
-            if meta_match:
-                analysis['description'] = meta_match.group(1)
+            self.rate_limiter.wait(website)
             
-            # Identify technologies
-            for category, techs in self.tech_indicators.items():
-                for tech in techs:
-                    if tech in content:
-                        analysis['technologies'].append(tech)
-            
-            # Identify pain points from content
-            for pain_type, keywords in self.pain_point_keywords.items():
-                for keyword in keywords:
-                    if keyword in content:
-                        analysis['pain_points'].append(pain_type)
-            
-            # Find key pages
-            key_pages = ['about', 'services', 'products', 'contact', 'blog', 'news']
-            for page in key_pages:
-                if f'/{page}' in content or f'{page}.html' in content:
-                    analysis['pages'].append(page)
-            
-            return analysis
+            # Only the head of the page is analyzed; servers ignoring Range are cut off while streaming
+            with self.session.get(website, timeout=15, stream=True,
+                                  headers={'Range': f'bytes=0-{MAX_PAGE_BYTES - 1}'}) as response:
+                if response.status_code not in (200, 206):
+                    return None
+                
+                body = b''.join(itertools.islice(response.iter_content(8192), MAX_PAGE_BYTES // 8192))
+                return body.decode(response.encoding or 'utf-8', 'replace')
             
         except Exception as e:
             print(f"Error analyzing website {website}: {str(e)}")
             return None
     
+    def analyze_website_content(self, content: str) -> Dict:
+        """Extract description, technologies, pain points and key pages from page content"""
+        analysis = {
+            'description': '',
+            'technologies': [],
+            'pain_points': [],
+            'contact_info': {},
+            'pages': []
+        }
+        
+        # Extract meta description
+        meta_match = META_DESC_RE.search(content)
+        if meta_match:
+            content_match = META_CONTENT_RE.search(meta_match.group(0))
+            if content_match:
+                analysis['description'] = (content_match.group(1) or content_match.group(2) or '').lower()
+        
+        found = self._find_keywords(content)
+        
+        # Identify technologies
+        for category, techs in self.tech_indicators.items():
+            for tech in techs:
+                if tech in found:
+                    analysis['technologies'].append(tech)
+        
+        # Identify pain points from content
+        for pain_type, keywords in self.pain_point_keywords.items():
+            for keyword in keywords:
+                if keyword in found:
+                    analysis['pain_points'].append(pain_type)
+        
+        # Find key pages
+        found_pages = {(slash or html).lower() for slash, html in KEY_PAGE_RE.findall(content)}
+        analysis['pages'] = [page for page in KEY_PAGES if page in found_pages]
+        
+        return analysis
+    
+    def _find_keywords(self, content: str) -> set:
+        """Keywords that occur anywhere in content, ignoring case"""
+        if self._keyword_re is None:
+            content = content.lower()
+            return {keyword for keyword in self._keywords if keyword in content}
+        
+        # re2 scans the original text case-insensitively; only match windows are lowercased
+        found = set()
+        reach = self._max_keyword_len - 1
+        for match in self._keyword_re.finditer(content):
+            # The scan does not report matches overlapping this one, so look around it
+            window = content[max(match.start() - reach, 0):match.end() + reach].lower()
+            found.update(keyword for keyword in self._keywords if keyword in window)
+        return found
+    
     def find_social_media_profiles(self, company_name: str, website: str) -> Dict[str, str]:
         """Find social media profiles for the company"""
         profiles = {}
         
-        # Extract domain for social media search
-        domain = urlparse(website).netloc.replace('www.', '')
-        company_slug = company_name.lower().replace(' ', '').replace(',', '').replace('.', '')
+        # Extract domain and name slugs for social media search
+        domain_root = urlparse(website).netloc.replace('www.', '').split('.')[0]
+        name_lower = company_name.lower()
+        slug_nospace = name_lower.replace(' ', '')
+        slugs = {
+            'slug': slug_nospace.replace(',', '').replace('.', ''),
+            'hyphen': name_lower.replace(' ', '-'),
+            'nospace': slug_nospace,
+            'domain': domain_root
+        }
         
         # Common social media profile patterns
         potential_profiles = {
-            'linkedin': [
-                f"linkedin.com/company/{company_slug}",
-                f"linkedin.com/company/{company_name.lower().replace(' ', '-')}",
-                f"linkedin.com/company/{domain.split('.')[0]}"
-            ],
-            'twitter': [
-                f"twitter.com/{company_slug}",
-                f"twitter.com/{domain.split('.')[0]}",
-                f"twitter.com/{company_name.lower().replace(' ', '')}"
-            ],
-            'facebook': [
-                f"facebook.com/{company_slug}",
-                f"facebook.com/{domain.split('.')[0]}",
-                f"facebook.com/{company_name.lower().replace(' ', '')}"
-            ]
+            platform: [template.format_map(slugs) for template in templates]
+            for platform, templates in self._SOCIAL_TEMPLATES.items()
         }
         
         # Check if profiles exist (simplified - in production, use actual API calls)
-        for platform, urls in potential_profiles.items():
-            for url in urls:
-                full_url = f"https://{url}"
-                try:
-                    response = self.session.head(full_url, timeout=5)
-                    if response.status_code == 200:
-                        profiles[platform] = full_url
-                        break
-                except:
-                    continue
+        # Every candidate is probed concurrently; the first profile found wins
+        probes = {
+            platform: [self._probe_executor.submit(self._resolve_profile, f"https://{url}") for url in urls]
+            for platform, urls in potential_profiles.items()
+        }
+        for platform, futures in probes.items():
+            for future in as_completed(futures):
+                profile_url = future.result()
+                if profile_url:
+                    profiles[platform] = profile_url
+                    # Probes that have not started yet are skipped
+                    for pending in futures:
+                        pending.cancel()
+                    break
         
         return profiles
     
+    def _resolve_profile(self, url: str) -> Optional[str]:
+        """HEAD-probe a candidate social profile URL, returning its final URL if it exists"""
+        try:
+            self.rate_limiter.wait(url)
+            response = self.session.head(url, timeout=5, allow_redirects=True)
+            if response.status_code == 200:
+                return response.url
+        except Exception:
+            pass
+        return None
+    
     def assess_digital_maturity(self, intelligence: CompanyIntelligence) -> float:
         """Assess company's digital maturity based on technology usage"""
         score = 0.0
@@ -257,9 +461,9 @@ class ProspectResearchAgent:
         
         # Website technology score (0.3)
         tech_score = 0.0
-        if intelligence.technologies_used:
-            modern_tech_count = len([t for t in intelligence.technologies_used 
-                                   if t in ['react', 'angular', 'vue', 'next.js', 'shopify']])
+        technologies = intelligence.technologies_used
+        if technologies:
+            modern_tech_count = sum(t in self._MODERN_TECH for t in technologies)
             tech_score = min(modern_tech_count / 3, 1.0) * 0.3
         
         # Social media presence score (0.2)
@@ -269,16 +473,13 @@ class ProspectResearchAgent:
         
         # Marketing tools score (0.3)
         marketing_score = 0.0
-        marketing_tools = [t for t in intelligence.technologies_used 
-                          if t in ['google analytics', 'hubspot', 'marketo', 'mailchimp']]
-        if marketing_tools:
-            marketing_score = min(len(marketing_tools) / 3, 1.0) * 0.3
+        marketing_tool_count = sum(t in self._MATURITY_MARKETING_TOOLS for t in technologies)
+        if marketing_tool_count:
+            marketing_score = min(marketing_tool_count / 3, 1.0) * 0.3
         
         # E-commerce capability score (0.2)
         ecommerce_score = 0.0
-        ecommerce_tools = [t for t in intelligence.technologies_used 
-                          if t in ['shopify', 'magento', 'woocommerce', 'bigcommerce']]
-        if ecommerce_tools:
+        if not self._ECOMMERCE_PLATFORMS.isdisjoint(technologies):
             ecommerce_score = 0.2
         
         score = tech_score + social_score + marketing_score + ecommerce_score
@@ -297,13 +498,12 @@ class ProspectResearchAgent:
             indicators.append("strong_social_presence")
         
         # Modern website technologies indicate recent investment
-        modern_techs = ['react', 'angular', 'vue', 'next.js', 'shopify']
-        if any(tech in intelligence.technologies_used for tech in modern_techs):
+        technologies = frozenset(intelligence.technologies_used)
+        if not self._MODERN_TECH.isdisjoint(technologies):
             indicators.append("modern_technology_stack")
         
         # Marketing automation tools indicate scaling efforts
-        marketing_tools = ['hubspot', 'marketo', 'pardot', 'mailchimp']
-        if any(tool in intelligence.technologies_used for tool in marketing_tools):
+        if not self._MARKETING_AUTOMATION.isdisjoint(technologies):
             indicators.append("marketing_automation_adoption")
         
         return indicators
@@ -311,77 +511,101 @@ class ProspectResearchAgent:
     def classify_industry(self, intelligence: CompanyIntelligence) -> str:
         """Classify company industry based on available data"""
         description = intelligence.description.lower()
-        technologies = [t.lower() for t in intelligence.technologies_used]
+        technologies = frozenset(t.lower() for t in intelligence.technologies_used)
         
         # E-commerce indicators
-        if any(tech in technologies for tech in ['shopify', 'magento', 'woocommerce']):
+        if not self._ECOMMERCE_INDUSTRY_TECH.isdisjoint(technologies):
             return 'e-commerce'
         
-        # Technology company indicators
-        tech_keywords = ['software', 'technology', 'app', 'platform', 'saas']
-        if any(keyword in description for keyword in tech_keywords):
-            return 'technology'
-        
-        # Professional services indicators
-        service_keywords = ['consulting', 'services', 'agency', 'firm']
-        if any(keyword in description for keyword in service_keywords):
-            return 'professional_services'
-        
-        # Healthcare indicators
-        health_keywords = ['health', 'medical', 'clinic', 'hospital']
-        if any(keyword in description for keyword in health_keywords):
-            return 'healthcare'
+        # Technology, professional services and healthcare indicators
+        for industry, keywords in self._INDUSTRY_KEYWORDS:
+            if any(keyword in description for keyword in keywords):
+                return industry
         
         # Default classification
         return 'general_business'
     
+    @staticmethod
+    def _intelligence_row(intelligence: CompanyIntelligence) -> tuple:
+        """Parameters for INSERT_INTELLIGENCE_SQL"""
+        return (
+            intelligence.company_name, intelligence.website, intelligence.industry,
+            intelligence.description, intelligence.founded_year, intelligence.headquarters,
+            intelligence.employee_count, intelligence.revenue_range,
+            _dumps(intelligence.funding_info), _dumps(intelligence.key_personnel),
+            _dumps(intelligence.competitors), _dumps(intelligence.technologies_used),
+            _dumps(intelligence.social_media_presence), _dumps(intelligence.recent_news),
+            _dumps(intelligence.pain_points), _dumps(intelligence.growth_indicators),
+            intelligence.digital_maturity_score, intelligence.research_date.isoformat()
+        )
+    
     def save_intelligence(self, intelligence: CompanyIntelligence) -> int:
         """Save company intelligence to database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO company_intelligence (
-                    company_name, website, industry, description, founded_year,
-                    headquarters, employee_count, revenue_range, funding_info,
-                    key_personnel, competitors, technologies_used,
-                    social_media_presence, recent_news, pain_points,
-                    growth_indicators, digital_maturity_score, research_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                intelligence.company_name, intelligence.website, intelligence.industry,
-                intelligence.description, intelligence.founded_year, intelligence.headquarters,
-                intelligence.employee_count, intelligence.revenue_range,
-                json.dumps(intelligence.funding_info), json.dumps(intelligence.key_personnel),
-                json.dumps(intelligence.competitors), json.dumps(intelligence.technologies_used),
-                json.dumps(intelligence.social_media_presence), json.dumps(intelligence.recent_news),
-                json.dumps(intelligence.pain_points), json.dumps(intelligence.growth_indicators),
-                intelligence.digital_maturity_score, intelligence.research_date.isoformat()
-            ))
-            
-            intelligence_id = cursor.lastrowid
-            conn.commit()
-            return intelligence_id
+            with self._lock:
+                cursor = self._conn.execute(INSERT_INTELLIGENCE_SQL, self._intelligence_row(intelligence))
+                return cursor.lastrowid
             
         except Exception as e:
             print(f"Error saving intelligence: {str(e)}")
             return 0
-        finally:
-            conn.close()
     
-    def get_intelligence(self, company_name: str, website: str) -> Optional[CompanyIntelligence]:
-        """Retrieve company intelligence from database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+    def save_intelligence_many(self, items: List[CompanyIntelligence]) -> int:
+        """Save many company intelligence records in one transaction"""
+        if not items:
+            return 0
         
-        cursor.execute('''
-            SELECT * FROM company_intelligence 
-            WHERE company_name = ? AND website = ?
-        ''', (company_name, website))
+        rows = [self._intelligence_row(item) for item in items]
         
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(INSERT_INTELLIGENCE_SQL, rows)
+                self._conn.execute("COMMIT")
+                return len(rows)
+                
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                print(f"Error saving intelligence: {str(e)}")
+                return 0
+    
+    def has_intelligence(self, company_name: str, website: str) -> bool:
+        """Check for stored intelligence without loading it (probes the UNIQUE index only)"""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT EXISTS (
+                    SELECT 1 FROM company_intelligence
+                    WHERE company_name = ? AND website = ?
+                )
+            ''', (company_name, website)).fetchone()
+        return bool(row[0])
+    
+    def _existing_keys(self, pairs: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """(company_name, website) pairs that already have stored intelligence"""
+        existing = set()
+        
+        # OR'd equality terms let SQLite probe the unique index per pair;
+        # chunks keep the bound parameters under SQLite's default limit
+        for start in range(0, len(pairs), 400):
+            chunk = pairs[start:start + 400]
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT company_name, website FROM company_intelligence WHERE '
+                    + ' OR '.join(['(company_name = ? AND website = ?)'] * len(chunk)),
+                    [value for pair in chunk for value in pair]
+                ).fetchall()
+            existing.update(rows)
+        
+        return existing
+    
+    def get_intelligence(self, company_name: str, website: str) -> Optional[CompanyIntelligence]:
+        """Retrieve company intelligence from database"""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT * FROM company_intelligence 
+                WHERE company_name = ? AND website = ?
+            ''', (company_name, website)).fetchone()
         
         if row:
             # Convert row to CompanyIntelligence object
@@ -403,13 +627,15 @@ class ProspectResearchAgent:
             
             for field in json_fields:
                 if data[field]:
-                    data[field] = json.loads(data[field])
+                    data[field] = _loads(data[field])
                 else:
                     data[field] = [] if field != 'funding_info' else {}
             
-            # Convert research_date
+            # Convert research_date (a missing date falls back to the dataclass default)
             if data['research_date']:
                 data['research_date'] = datetime.fromisoformat(data['research_date'])
+            else:
+                del data['research_date']
             
             # Remove id field and create CompanyIntelligence object
             del data['id']
@@ -417,63 +643,89 @@ class ProspectResearchAgent:
         
         return None
     
-    def research_leads_batch(self, leads: List[Dict]) -> List[CompanyIntelligence]:
-        """Research multiple leads in batch"""
-        intelligence_results = []
-        
-        for lead in leads:
-            company_name = lead['company_name']
-            website = lead['website']
+    def research_leads_batch(self, leads: List[Dict], include_cached: bool = True,
+                             processes: Optional[int] = None) -> List[CompanyIntelligence]:
+        """Research multiple leads in batch (see iter_research_leads)"""
+        return list(self.iter_research_leads(leads, include_cached, processes))
+    
+    def iter_research_leads(self, leads: List[Dict], include_cached: bool = True,
+                            processes: Optional[int] = None) -> Iterator[CompanyIntelligence]:
+        """
+        Research multiple leads, yielding intelligence in lead order. New
+        companies are fetched concurrently and saved together; cached ones
+        are only loaded from the database as they are reached. With
+        include_cached=False, companies already researched are skipped.
+        processes > 1 runs the CPU-bound analysis in that many worker processes.
+        """
+        # One lookup for every company we already have intelligence for
+        keys = [(lead['company_name'], lead['website']) for lead in leads]
+        unique_keys = list(dict.fromkeys(keys))
+        existing_keys = self._existing_keys(unique_keys)
+        
+        # A company listed more than once in the batch is researched once
+        to_research = [key for key in unique_keys if key not in existing_keys]
+        researched = {}
+        
+        # Conduct new research; each company's requests go to a different host
+        if to_research:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_research))) as executor:
+                raws = list(executor.map(lambda key: self._fetch_raw(*key), to_research))
             
-            # Check if we already have intelligence for this company
-            existing_intelligence = self.get_intelligence(company_name, website)
+            # Analysis is pure CPU, so threads would serialize on the GIL. Workers are
+            # spawned, not forked, so they never inherit this process's threads and connections
+            if processes and processes > 1 and len(raws) > 1:
+                with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_enrich_worker) as executor:
+                    researched = dict(zip(to_research, executor.map(_enrich_in_worker, raws, chunksize=8)))
+            else:
+                researched = {key: self._enrich(raw) for key, raw in zip(to_research, raws)}
             
-            if existing_intelligence:
-                print(f"Using existing intelligence for {company_name}")
-                intelligence_results.append(existing_intelligence)
+            # Save to database in one transaction
+            saved = self.save_intelligence_many(list(researched.values()))
+            if saved:
+                print(f"Saved intelligence for {saved} companies")
+        
+        for key, lead in zip(keys, leads):
+            if key in researched:
+                yield researched[key]
+            elif include_cached:
+                print(f"Using existing intelligence for {lead['company_name']}")
+                intelligence = self.get_intelligence(lead['company_name'], lead['website'])
+                if intelligence is not None:
+                    yield intelligence
             else:
-                # Conduct new research
-                intelligence = self.research_company(company_name, website)
-                
-                # Save to database
-                intelligence_id = self.save_intelligence(intelligence)
-                if intelligence_id:
-                    print(f"Saved intelligence for {company_name} (ID: {intelligence_id})")
-                
-                intelligence_results.append(intelligence)
-                
-                # Rate limiting
-                time.sleep(2)
-        
-        return intelligence_results
+                print(f"Skipping {lead['company_name']}, already researched")
     
     def generate_prospect_summary(self, intelligence: CompanyIntelligence) -> str:
         """Generate a summary of prospect research for sales team"""
-        summary = f"""
-PROSPECT RESEARCH SUMMARY
-Company: {intelligence.company_name}
-Website: {intelligence.website}
-Industry: {intelligence.industry}
-Digital Maturity Score: {intelligence.digital_maturity_score:.2f}/1.0
+        return PROSPECT_SUMMARY_TEMPLATE.format_map({
+            'company_name': intelligence.company_name,
+            'website': intelligence.website,
+            'industry': intelligence.industry,
+            'digital_maturity_score': intelligence.digital_maturity_score,
+            'description': intelligence.description,
+            'technologies': ', '.join(intelligence.technologies_used) or 'None identified',
+            'social_media': ', '.join(intelligence.social_media_presence) or 'Limited',
+            'pain_points': ', '.join(intelligence.pain_points) or 'None identified',
+            'growth_indicators': ', '.join(intelligence.growth_indicators) or 'None identified',
+            'research_date': intelligence.research_date
+        })
 
-DESCRIPTION:
-{intelligence.description}
 
-TECHNOLOGIES USED:
-{', '.join(intelligence.technologies_used) if intelligence.technologies_used else 'None identified'}
+# Per-process analyzer for research_leads_batch(processes=...); built once per worker
+_worker_agent = None
 
-SOCIAL MEDIA PRESENCE:
-{', '.join(intelligence.social_media_presence.keys()) if intelligence.social_media_presence else 'Limited'}
 
-IDENTIFIED PAIN POINTS:
-{', '.join(intelligence.pain_points) if intelligence.pain_points else 'None identified'}
+def _init_enrich_worker():
+    """Build the worker's analyzer (keyword tables and regexes) once, without a database, session or threads"""
+    global _worker_agent
+    _worker_agent = ProspectResearchAgent.__new__(ProspectResearchAgent)
+    _worker_agent._init_analyzer()
 
-GROWTH INDICATORS:
-{', '.join(intelligence.growth_indicators) if intelligence.growth_indicators else 'None identified'}
 
-RESEARCH DATE: {intelligence.research_date.strftime('%Y-%m-%d')}
-"""
-        return summary
+def _enrich_in_worker(raw: Dict) -> CompanyIntelligence:
+    """Run the CPU stage of research in a worker process"""
+    return _worker_agent._enrich(raw)
 
 
 def main():
@@ -492,11 +744,8 @@ def main():
         }
     ]
     
-    # Research leads
-    intelligence_results = agent.research_leads_batch(sample_leads)
-    
-    # Generate summaries
-    for intelligence in intelligence_results:
+    # Research leads and generate summaries as results arrive
+    for intelligence in agent.iter_research_leads(sample_leads):
         summary = agent.generate_prospect_summary(intelligence)
         print(summary)
         print("-" * 80)
@@ -5,14 +5,32 @@ This agent handles proposal generation, pricing, contracts, and deal closing
 
 import sqlite3
 import json
+import atexit
+import asyncio
+import hashlib
+import re
+import time
 import openai
 from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 import random
 
+try:
+    import orjson
+    
+    def _dumps(value) -> str:
+        return orjson.dumps(value).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 
 class DealStage(Enum):
     """Sales deal stages"""
@@ -40,18 +58,18 @@ class ServiceOffering:
     package: ServicePackage
     monthly_price: int
     setup_fee: int
-    services_included: List[str]
-    deliverables: List[str]
+    services_included: Tuple[str, ...]
+    deliverables: Tuple[str, ...]
     timeline: str
-    ideal_for: List[str]
+    ideal_for: Tuple[str, ...]
     
     def __post_init__(self):
         if not self.services_included:
-            self.services_included = []
+            self.services_included = ()
         if not self.deliverables:
-            self.deliverables = []
+            self.deliverables = ()
         if not self.ideal_for:
-            self.ideal_for = []
+            self.ideal_for = ()
 
 
 @dataclass
@@ -101,6 +119,213 @@ class SalesDeal:
             self.last_activity = datetime.now()
 
 
+# Package catalogue shared by every agent instance (offerings hold tuples, so it is safe to share)
+SERVICE_PACKAGES = MappingProxyType({
+    ServicePackage.STARTER: ServiceOffering(
+        name="Digital Marketing Starter",
+        package=ServicePackage.STARTER,
+        monthly_price=2500,
+        setup_fee=500,
+        services_included=(
+            "SEO optimization",
+            "Google Ads management",
+            "Social media setup",
+            "Monthly reporting",
+            "Email support"
+        ),
+        deliverables=(
+            "SEO audit and optimization",
+            "Google Ads campaign setup",
+            "Social media profiles optimization",
+            "Monthly performance report"
+        ),
+        timeline="2-4 weeks setup, ongoing monthly management",
+        ideal_for=("small businesses", "startups", "local companies")
+    ),
+    ServicePackage.GROWTH: ServiceOffering(
+        name="Digital Marketing Growth",
+        package=ServicePackage.GROWTH,
+        monthly_price=5000,
+        setup_fee=1000,
+        services_included=(
+            "Comprehensive SEO",
+            "Google & Facebook Ads",
+            "Content marketing",
+            "Social media management",
+            "Email marketing automation",
+            "Conversion optimization",
+            "Weekly reporting",
+            "Phone & email support"
+        ),
+        deliverables=(
+            "Complete SEO strategy and implementation",
+            "Multi-platform ad campaigns",
+            "Content calendar and creation",
+            "Marketing automation setup",
+            "Weekly performance reports"
+        ),
+        timeline="3-6 weeks setup, ongoing monthly management",
+        ideal_for=("growing businesses", "e-commerce", "professional services")
+    ),
+    ServicePackage.ENTERPRISE: ServiceOffering(
+        name="Enterprise Digital Marketing",
+        package=ServicePackage.ENTERPRISE,
+        monthly_price=10000,
+        setup_fee=2500,
+        services_included=(
+            "Advanced SEO & technical optimization",
+            "Multi-platform advertising",
+            "Content marketing & PR",
+            "Marketing automation",
+            "CRM integration",
+            "Advanced analytics & attribution",
+            "Dedicated account manager",
+            "Priority support"
+        ),
+        deliverables=(
+            "Enterprise SEO strategy",
+            "Omnichannel advertising campaigns",
+            "Content marketing program",
+            "Marketing technology stack setup",
+            "Custom analytics dashboard"
+        ),
+        timeline="4-8 weeks setup, ongoing monthly management",
+        ideal_for=("large companies", "enterprises", "high-growth businesses")
+    )
+})
+
+# Close probability for each deal stage, keyed by DealStage value
+STAGE_PROBABILITIES = {
+    DealStage.INITIAL_CONTACT.value: 0.1,
+    DealStage.DISCOVERY.value: 0.2,
+    DealStage.PROPOSAL_SENT.value: 0.3,
+    DealStage.NEGOTIATION.value: 0.6,
+    DealStage.CONTRACT_SENT.value: 0.8,
+    DealStage.CLOSED_WON.value: 1.0,
+    DealStage.CLOSED_LOST.value: 0.0
+}
+
+MAX_DEAL_NOTES_CHARS = 8000
+
+BUDGET_RE = re.compile(r'\d+(?:,\d{3})*')
+
+# Objection categories in priority order, with the keywords that trigger each
+OBJECTION_KEYWORDS = (
+    ('price', ('price', 'cost', 'expensive', 'budget')),
+    ('time', ('time', 'timing', 'busy', 'schedule')),
+    ('results', ('results', 'guarantee', 'proof', 'work')),
+    ('competition', ('competitor', 'other', 'compare', 'shopping')),
+)
+
+OBJECTION_RESPONSES = {
+    'price': "I understand budget is a concern. Let's look at the ROI - our clients typically see a 3-5x return on their marketing investment within 6 months. Would you like to discuss a smaller package or payment plan?",
+    'time': "I appreciate that timing is important. We can actually start with a smaller scope and scale up as you see results. What timeline would work better for you?",
+    'results': "That's a valid concern. We provide detailed monthly reports and guarantee specific KPIs. If we don't meet our commitments in the first 90 days, we'll work for free until we do.",
+    'competition': "It's smart to compare options. What specific concerns do you have about our approach compared to others you're considering?"
+}
+
+DEFAULT_OBJECTION_RESPONSE = "I understand your concern. Could you tell me more about what's holding you back so I can address it properly?"
+
+
+@lru_cache(maxsize=1024)
+def _extract_budget_amount(budget_range: str) -> Optional[int]:
+    """Parse the monthly budget out of a budget range string (cached per distinct string)"""
+    if not budget_range:
+        return None
+    
+    # Extract numbers from budget string
+    numbers = BUDGET_RE.findall(budget_range.replace('$', '').replace(',', ''))
+    if numbers:
+        amount = int(numbers[0])
+        
+        # Convert yearly to monthly if needed
+        if '/year' in budget_range or 'yearly' in budget_range:
+            amount = amount // 12
+        
+        return amount
+    
+    return None
+
+
+@lru_cache(maxsize=2048)
+def _recommend_package(budget_amount: Optional[int], employee_count: Optional[int], industry: str) -> ServicePackage:
+    """Package recommendation from budget, company size and lowercased industry"""
+    if budget_amount and budget_amount >= 8000:
+        return ServicePackage.ENTERPRISE
+    elif budget_amount and budget_amount >= 4000:
+        return ServicePackage.GROWTH
+    elif employee_count and employee_count > 100:
+        return ServicePackage.ENTERPRISE
+    elif employee_count and employee_count > 25:
+        return ServicePackage.GROWTH
+    elif industry in ['enterprise', 'finance', 'healthcare']:
+        return ServicePackage.ENTERPRISE
+    else:
+        return ServicePackage.STARTER
+
+@lru_cache(maxsize=256)
+def _json_list(items: Tuple[str, ...]) -> str:
+    """JSON-encode a string list; proposals repeat the same few package lists"""
+    return _dumps(items)
+
+
+@lru_cache(maxsize=1024)
+def _parse_pain_points(pain_points: str):
+    """Decode a stored pain_points JSON list (cached, since a lead's text repeats across calls)"""
+    try:
+        parsed = _loads(pain_points)
+    except ValueError:
+        return ()
+    return tuple(parsed) if isinstance(parsed, list) else parsed
+
+
+@lru_cache(maxsize=256)
+def _bullet_list(items: Tuple[str, ...]) -> str:
+    """One '• item' line per entry; proposals repeat the same few package lists"""
+    if not items:
+        return ''
+    return '• ' + '\n• '.join(items)
+
+
+INSERT_PROPOSAL_SQL = '''
+    INSERT INTO sales_proposals (
+        lead_id, proposal_id, package, monthly_price, setup_fee,
+        total_first_month, services_included, deliverables, timeline,
+        custom_notes, discount_percentage, proposal_date, expiry_date, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(proposal_id) DO UPDATE SET
+        lead_id = excluded.lead_id,
+        package = excluded.package,
+        monthly_price = excluded.monthly_price,
+        setup_fee = excluded.setup_fee,
+        total_first_month = excluded.total_first_month,
+        services_included = excluded.services_included,
+        deliverables = excluded.deliverables,
+        timeline = excluded.timeline,
+        custom_notes = excluded.custom_notes,
+        discount_percentage = excluded.discount_percentage,
+        proposal_date = excluded.proposal_date,
+        expiry_date = excluded.expiry_date,
+        status = excluded.status
+'''
+
+INSERT_DEAL_SQL = '''
+    INSERT INTO sales_deals (
+        lead_id, deal_id, stage, proposal_id, value, probability,
+        expected_close_date, last_activity, notes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(deal_id) DO UPDATE SET
+        lead_id = excluded.lead_id,
+        stage = excluded.stage,
+        proposal_id = excluded.proposal_id,
+        value = excluded.value,
+        probability = excluded.probability,
+        expected_close_date = excluded.expected_close_date,
+        last_activity = excluded.last_activity,
+        notes = excluded.notes
+'''
+
+
 class SalesAutomationAgent:
     """
     AI-powered sales automation agent for deal closing
@@ -108,10 +333,30 @@ class SalesAutomationAgent:
     
     def __init__(self, database_path: str = "leads.db"):
         self.database_path = database_path
+        
+        # One autocommit connection for the agent's lifetime; single statements commit on their own
+        self.conn = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-20000')
+        atexit.register(self.conn.close)
+        self._deal_cache_ready = False
         self.setup_database()
         
-        # Initialize OpenAI client
+        # Initialize OpenAI client (the async client is created on first use, see openai_async)
         self.openai_client = openai.OpenAI()
+        self._openai_async_client = None
+        
+        # Concurrency cap and retry budget for batched proposal generation;
+        # cache_responses reuses stored completions for identical prompts (llm_cache table)
+        self.llm_config = {
+            'model': 'gpt-4.1-mini',
+            'max_concurrent_requests': 10,
+            'max_retries': 5,
+            'cache_responses': True
+        }
         
         # Service packages configuration
         self.service_packages = self.initialize_service_packages()
@@ -134,10 +379,20 @@ class SalesAutomationAgent:
             'custom': 'custom_service_agreement.pdf'
         }
     
+    @property
+    def openai_async(self):
+        """Async OpenAI client; retries 429s, timeouts and 5xx with exponential backoff"""
+        if self._openai_async_client is None:
+            self._openai_async_client = openai.AsyncOpenAI(max_retries=self.llm_config['max_retries'])
+        return self._openai_async_client
+    
+    def close(self):
+        """Close the persistent database connection"""
+        self.conn.close()
+    
     def setup_database(self):
         """Initialize database tables for sales data"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sales_proposals (
@@ -172,10 +427,21 @@ class SalesAutomationAgent:
                 expected_close_date TEXT,
                 last_activity TEXT,
                 notes TEXT,
+                company_name_cache TEXT,
+                contact_name_cache TEXT,
+                monthly_price_cache INTEGER,
                 FOREIGN KEY (lead_id) REFERENCES leads (id)
             )
         ''')
         
+        # Databases created before the cache columns existed get them added in place
+        cursor.execute('PRAGMA table_info(sales_deals)')
+        deal_columns = {row[1] for row in cursor.fetchall()}
+        for column, column_type in (('company_name_cache', 'TEXT'), ('contact_name_cache', 'TEXT'),
+                                    ('monthly_price_cache', 'INTEGER')):
+            if column not in deal_columns:
+                cursor.execute(f'ALTER TABLE sales_deals ADD COLUMN {column} {column_type}')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sales_activities (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -187,88 +453,141 @@ class SalesAutomationAgent:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                prompt_hash TEXT PRIMARY KEY,
+                response TEXT
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_deals_proposal ON sales_deals(proposal_id)
+        ''')
+        # Covers get_sales_metrics' GROUP BY stage so it never touches the table rows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_deals_stage_value ON sales_deals(stage, value, probability)
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_deals_stage')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_deals_lead ON sales_deals(lead_id)
+        ''')
+        
+        # lead_qualifications belongs to the qualification agent and may not exist yet
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lead_qualifications'")
+        if cursor.fetchone():
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_qual_leadid ON lead_qualifications(lead_id)
+            ''')
+        
+        self._ensure_deal_cache()
     
-    def initialize_service_packages(self) -> Dict[ServicePackage, ServiceOffering]:
-        """Initialize service package configurations"""
-        packages = {}
-        
-        packages[ServicePackage.STARTER] = ServiceOffering(
-            name="Digital Marketing Starter",
-            package=ServicePackage.STARTER,
-            monthly_price=2500,
-            setup_fee=500,
-            services_included=[
-                "SEO optimization",
-                "Google Ads management",
-                "Social media setup",
-                "Monthly reporting",
-                "Email support"
-            ],
-            deliverables=[
-                "SEO audit and optimization",
-                "Google Ads campaign setup",
-                "Social media profiles optimization",
-                "Monthly performance report"
-            ],
-            timeline="2-4 weeks setup, ongoing monthly management",
-            ideal_for=["small businesses", "startups", "local companies"]
-        )
+    def _ensure_deal_cache(self):
+        """
+        Install the deal cache triggers once the leads table exists. Their subqueries read
+        leads when they fire, so they cannot be created before it (deal inserts would fail);
+        deals saved until then are filled in by the backfill at install time.
+        """
+        if self._deal_cache_ready:
+            return
+        
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads'")
+        if cursor.fetchone():
+            self.setup_deal_cache_triggers(cursor)
+            self._deal_cache_ready = True
+    
+    def setup_deal_cache_triggers(self, cursor):
+        """
+        Keep the lead name and proposal price copies on sales_deals in step with their
+        source rows, so pipeline queries read sales_deals alone. A NULL company_name_cache
+        means the deal has no lead (leads.company_name is NOT NULL).
+        """
+        refresh_deal = '''
+                UPDATE sales_deals SET
+                    company_name_cache = (SELECT company_name FROM leads WHERE id = NEW.lead_id),
+                    contact_name_cache = (SELECT contact_name FROM leads WHERE id = NEW.lead_id),
+                    monthly_price_cache = (SELECT monthly_price FROM sales_proposals WHERE proposal_id = NEW.proposal_id)
+                WHERE id = NEW.id;
+        '''
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_insert
+            AFTER INSERT ON sales_deals
+            BEGIN
+                {refresh_deal}
+            END
+        ''')
         
-        packages[ServicePackage.GROWTH] = ServiceOffering(
-            name="Digital Marketing Growth",
-            package=ServicePackage.GROWTH,
-            monthly_price=5000,
-            setup_fee=1000,
-            services_included=[
-                "Comprehensive SEO",
-                "Google & Facebook Ads",
-                "Content marketing",
-                "Social media management",
-                "Email marketing automation",
-                "Conversion optimization",
-                "Weekly reporting",
-                "Phone & email support"
-            ],
-            deliverables=[
-                "Complete SEO strategy and implementation",
-                "Multi-platform ad campaigns",
-                "Content calendar and creation",
-                "Marketing automation setup",
-                "Weekly performance reports"
-            ],
-            timeline="3-6 weeks setup, ongoing monthly management",
-            ideal_for=["growing businesses", "e-commerce", "professional services"]
-        )
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_update
+            AFTER UPDATE OF lead_id, proposal_id ON sales_deals
+            BEGIN
+                {refresh_deal}
+            END
+        ''')
         
-        packages[ServicePackage.ENTERPRISE] = ServiceOffering(
-            name="Enterprise Digital Marketing",
-            package=ServicePackage.ENTERPRISE,
-            monthly_price=10000,
-            setup_fee=2500,
-            services_included=[
-                "Advanced SEO & technical optimization",
-                "Multi-platform advertising",
-                "Content marketing & PR",
-                "Marketing automation",
-                "CRM integration",
-                "Advanced analytics & attribution",
-                "Dedicated account manager",
-                "Priority support"
-            ],
-            deliverables=[
-                "Enterprise SEO strategy",
-                "Omnichannel advertising campaigns",
-                "Content marketing program",
-                "Marketing technology stack setup",
-                "Custom analytics dashboard"
-            ],
-            timeline="4-8 weeks setup, ongoing monthly management",
-            ideal_for=["large companies", "enterprises", "high-growth businesses"]
-        )
+        # Deals saved before their lead row existed pick up its names when it is inserted
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_lead_insert
+            AFTER INSERT ON leads
+            BEGIN
+                UPDATE sales_deals SET
+                    company_name_cache = NEW.company_name,
+                    contact_name_cache = NEW.contact_name
+                WHERE lead_id = NEW.id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_lead_update
+            AFTER UPDATE OF company_name, contact_name ON leads
+            BEGIN
+                UPDATE sales_deals SET
+                    company_name_cache = NEW.company_name,
+                    contact_name_cache = NEW.contact_name
+                WHERE lead_id = NEW.id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_lead_delete
+            AFTER DELETE ON leads
+            BEGIN
+                UPDATE sales_deals SET company_name_cache = NULL, contact_name_cache = NULL
+                WHERE lead_id = OLD.id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_proposal_update
+            AFTER UPDATE OF monthly_price ON sales_proposals
+            BEGIN
+                UPDATE sales_deals SET monthly_price_cache = NEW.monthly_price
+                WHERE proposal_id = NEW.proposal_id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS sales_deal_cache_proposal_delete
+            AFTER DELETE ON sales_proposals
+            BEGIN
+                UPDATE sales_deals SET monthly_price_cache = NULL
+                WHERE proposal_id = OLD.proposal_id;
+            END
+        ''')
         
-        return packages
+        # Fill rows written before the triggers existed (or whose lead has since appeared)
+        cursor.execute('''
+            UPDATE sales_deals SET
+                company_name_cache = (SELECT company_name FROM leads WHERE id = sales_deals.lead_id),
+                contact_name_cache = (SELECT contact_name FROM leads WHERE id = sales_deals.lead_id),
+                monthly_price_cache = (SELECT monthly_price FROM sales_proposals WHERE proposal_id = sales_deals.proposal_id)
+            WHERE company_name_cache IS NULL
+        ''')
+    
+    def initialize_service_packages(self) -> Dict[ServicePackage, ServiceOffering]:
+        """Initialize service package configurations"""
+        return SERVICE_PACKAGES
     
     def analyze_lead_for_package_recommendation(self, lead_data: Dict, qualification_data: Dict) -> ServicePackage:
         """Analyze lead to recommend appropriate service package"""
@@ -284,37 +603,11 @@ class SalesAutomationAgent:
         industry = lead_data.get('industry', '').lower()
         
         # Package recommendation logic
-        if budget_amount and budget_amount >= 8000:
-            return ServicePackage.ENTERPRISE
-        elif budget_amount and budget_amount >= 4000:
-            return ServicePackage.GROWTH
-        elif employee_count and employee_count > 100:
-            return ServicePackage.ENTERPRISE
-        elif employee_count and employee_count > 25:
-            return ServicePackage.GROWTH
-        elif industry in ['enterprise', 'finance', 'healthcare']:
-            return ServicePackage.ENTERPRISE
-        else:
-            return ServicePackage.STARTER
+        return _recommend_package(budget_amount, employee_count, industry)
     
     def extract_budget_amount(self, budget_range: str) -> Optional[int]:
         """Extract numeric budget amount from budget range string"""
-        if not budget_range:
-            return None
-        
-        import re
-        # Extract numbers from budget string
-        numbers = re.findall(r'\\d+(?:,\\d{3})*', budget_range.replace('$', '').replace(',', ''))
-        if numbers:
-            amount = int(numbers[0])
-            
-            # Convert yearly to monthly if needed
-            if '/year' in budget_range or 'yearly' in budget_range:
-                amount = amount // 12
-            
-            return amount
-        
-        return None
+        return _extract_budget_amount(budget_range)
     
     def calculate_custom_pricing(self, base_package: ServicePackage, lead_data: Dict, qualification_data: Dict) -> Tuple[int, int, float]:
         """Calculate custom pricing based on lead characteristics"""
@@ -348,8 +641,8 @@ class SalesAutomationAgent:
         
         return monthly_price, setup_fee, discount
     
-    def generate_proposal_content(self, lead_data: Dict, qualification_data: Dict, proposal: SalesProposal) -> str:
-        """Generate personalized proposal content using AI"""
+    def _proposal_messages(self, lead_data: Dict, qualification_data: Dict, proposal: SalesProposal) -> List[Dict]:
+        """Chat messages asking the model for a personalized proposal"""
         
         company_name = lead_data.get('company_name', 'Your Company')
         contact_name = lead_data.get('contact_name', 'there')
@@ -358,10 +651,7 @@ class SalesAutomationAgent:
         
         # Parse pain points if they're JSON string
         if isinstance(pain_points, str):
-            try:
-                pain_points = json.loads(pain_points)
-            except:
-                pain_points = []
+            pain_points = _parse_pain_points(pain_points)
         
         pain_points_text = ', '.join(pain_points) if pain_points else 'digital marketing challenges'
         
@@ -387,17 +677,73 @@ class SalesAutomationAgent:
         Keep it professional but personable, around 800-1000 words.
         """
         
-        try:
+        return [
+            {"role": "system", "content": "You are an expert sales proposal writer for digital marketing services. Create compelling, personalized proposals that address client needs and drive conversions."},
+            {"role": "user", "content": proposal_prompt}
+        ]
+    
+    def _prompt_hash(self, messages: List[Dict]) -> str:
+        """Cache key for a chat request: model plus the exact messages"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.llm_config['model'].encode('utf-8'))
+        digest.update(json.dumps(messages, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _cached_response(self, prompt_hash: str) -> Optional[str]:
+        """Stored completion for a prompt hash, if caching is on and one exists"""
+        if not self.llm_config['cache_responses']:
+            return None
+        row = self.conn.execute('SELECT response FROM llm_cache WHERE prompt_hash = ?', (prompt_hash,)).fetchone()
+        return row[0] if row else None
+    
+    def _store_response(self, prompt_hash: str, response: str):
+        """Remember a completion for later identical prompts"""
+        if self.llm_config['cache_responses'] and response is not None:
+            self.conn.execute('INSERT OR IGNORE INTO llm_cache (prompt_hash, response) VALUES (?, ?)',
+                              (prompt_hash, response))
+    
+    def _cached_completion(self, messages: List[Dict]) -> str:
+        """Chat completion text, served from llm_cache when the same prompt was seen before"""
+        prompt_hash = self._prompt_hash(messages)
+        content = self._cached_response(prompt_hash)
+        if content is None:
             response = self.openai_client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert sales proposal writer for digital marketing services. Create compelling, personalized proposals that address client needs and drive conversions."},
-                    {"role": "user", "content": proposal_prompt}
-                ],
+                model=self.llm_config['model'],
+                messages=messages,
+                temperature=0.7
+            )
+            content = response.choices[0].message.content
+            self._store_response(prompt_hash, content)
+        return content
+    
+    async def _cached_completion_async(self, messages: List[Dict]) -> str:
+        """Async variant of _cached_completion"""
+        prompt_hash = self._prompt_hash(messages)
+        content = self._cached_response(prompt_hash)
+        if content is None:
+            response = await self.openai_async.chat.completions.create(
+                model=self.llm_config['model'],
+                messages=messages,
                 temperature=0.7
             )
+            content = response.choices[0].message.content
+            self._store_response(prompt_hash, content)
+        return content
+    
+    def generate_proposal_content(self, lead_data: Dict, qualification_data: Dict, proposal: SalesProposal) -> str:
+        """Generate personalized proposal content using AI"""
+        try:
+            return self._cached_completion(self._proposal_messages(lead_data, qualification_data, proposal))
             
-            return response.choices[0].message.content
+        except Exception as e:
+            print(f"Error generating proposal content: {str(e)}")
+            return self.generate_fallback_proposal(lead_data, proposal)
+    
+    async def generate_proposal_content_async(self, lead_data: Dict, qualification_data: Dict,
+                                              proposal: SalesProposal) -> str:
+        """Async variant of generate_proposal_content"""
+        try:
+            return await self._cached_completion_async(self._proposal_messages(lead_data, qualification_data, proposal))
             
         except Exception as e:
             print(f"Error generating proposal content: {str(e)}")
@@ -423,10 +769,10 @@ class SalesAutomationAgent:
         Total First Month: ${proposal.total_first_month:,}
         
         SERVICES INCLUDED:
-        {chr(10).join(f'• {service}' for service in proposal.services_included)}
+        {_bullet_list(tuple(proposal.services_included))}
         
         DELIVERABLES:
-        {chr(10).join(f'• {deliverable}' for deliverable in proposal.deliverables)}
+        {_bullet_list(tuple(proposal.deliverables))}
         
         Timeline: {proposal.timeline}
         
@@ -442,34 +788,36 @@ class SalesAutomationAgent:
         AI Marketing Solutions
         """
     
-    def create_proposal(self, lead_id: int) -> Optional[SalesProposal]:
-        """Create a sales proposal for a qualified lead"""
-        
-        # Get lead and qualification data
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM leads WHERE id = ?', (lead_id,))
-        lead_row = cursor.fetchone()
-        
-        if not lead_row:
-            conn.close()
+    def _load_lead_context(self, lead_id: int) -> Optional[Tuple[Dict, Dict]]:
+        """Lead and qualification fields for a lead, or None if either record is missing"""
+        row = self.conn.execute('''
+            SELECT l.company_name, l.contact_name, l.industry, l.employee_count,
+                   q.budget_range, q.pain_points
+            FROM leads l
+            JOIN lead_qualifications q ON q.lead_id = l.id
+            WHERE l.id = ?
+            ORDER BY q.id
+            LIMIT 1
+        ''', (lead_id,)).fetchone()
+        
+        if not row:
             return None
         
-        lead_columns = [desc[0] for desc in cursor.description]
-        lead_data = dict(zip(lead_columns, lead_row))
-        
-        cursor.execute('SELECT * FROM lead_qualifications WHERE lead_id = ?', (lead_id,))
-        qual_row = cursor.fetchone()
-        
-        if not qual_row:
-            conn.close()
-            return None
-        
-        qual_columns = [desc[0] for desc in cursor.description]
-        qualification_data = dict(zip(qual_columns, qual_row))
+        lead_data = {
+            'company_name': row['company_name'],
+            'contact_name': row['contact_name'],
+            'industry': row['industry'],
+            'employee_count': row['employee_count']
+        }
+        qualification_data = {
+            'budget_range': row['budget_range'],
+            'pain_points': row['pain_points']
+        }
         
-        conn.close()
+        return lead_data, qualification_data
+    
+    def _build_proposal(self, lead_id: int, lead_data: Dict, qualification_data: Dict) -> SalesProposal:
+        """Price and package a proposal; custom_notes is filled in afterwards"""
         
         # Recommend package
         recommended_package = self.analyze_lead_for_package_recommendation(lead_data, qualification_data)
@@ -490,98 +838,226 @@ class SalesAutomationAgent:
             monthly_price=monthly_price,
             setup_fee=setup_fee,
             total_first_month=monthly_price + setup_fee,
-            services_included=package_offering.services_included,
-            deliverables=package_offering.deliverables,
+            services_included=list(package_offering.services_included),
+            deliverables=list(package_offering.deliverables),
             timeline=package_offering.timeline,
             discount_percentage=discount
         )
         
+        return proposal
+    
+    def create_proposal(self, lead_id: int, save: bool = True) -> Optional[SalesProposal]:
+        """Create a sales proposal for a qualified lead (pass save=False to batch via save_proposals_bulk)"""
+        
+        # Get lead and qualification data
+        context = self._load_lead_context(lead_id)
+        if not context:
+            return None
+        
+        lead_data, qualification_data = context
+        proposal = self._build_proposal(lead_id, lead_data, qualification_data)
+        
         # Generate proposal content
         proposal_content = self.generate_proposal_content(lead_data, qualification_data, proposal)
         proposal.custom_notes = proposal_content
         
         # Save proposal
-        self.save_proposal(proposal)
+        if save:
+            self.save_proposal(proposal)
         
         return proposal
     
-    def save_proposal(self, proposal: SalesProposal):
-        """Save proposal to database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+    def _prepare_proposals(self, lead_ids: List[int]) -> List[Tuple[Dict, Dict, SalesProposal]]:
+        """(lead_data, qualification_data, proposal) for each lead that has both records"""
+        jobs = []
+        for lead_id in lead_ids:
+            context = self._load_lead_context(lead_id)
+            if context:
+                lead_data, qualification_data = context
+                jobs.append((lead_data, qualification_data,
+                             self._build_proposal(lead_id, lead_data, qualification_data)))
+        return jobs
+    
+    async def create_proposals_bulk(self, lead_ids: List[int], save: bool = True) -> List[SalesProposal]:
+        """Create proposals for many leads, generating their content concurrently"""
+        semaphore = asyncio.Semaphore(self.llm_config['max_concurrent_requests'])
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO sales_proposals (
-                lead_id, proposal_id, package, monthly_price, setup_fee,
-                total_first_month, services_included, deliverables, timeline,
-                custom_notes, discount_percentage, proposal_date, expiry_date, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        async def generate(lead_data, qualification_data, proposal):
+            async with semaphore:
+                return await self.generate_proposal_content_async(lead_data, qualification_data, proposal)
+        
+        jobs = self._prepare_proposals(lead_ids)
+        contents = await asyncio.gather(*(generate(*job) for job in jobs), return_exceptions=True)
+        
+        proposals = []
+        for (lead_data, _, proposal), content in zip(jobs, contents):
+            if isinstance(content, BaseException):
+                print(f"Error generating proposal content: {str(content)}")
+                content = self.generate_fallback_proposal(lead_data, proposal)
+            proposal.custom_notes = content
+            proposals.append(proposal)
+        
+        if save:
+            self.save_proposals_bulk(proposals)
+        
+        return proposals
+    
+    def create_proposals_batch(self, lead_ids: List[int], poll_interval: float = 60,
+                               save: bool = True) -> List[SalesProposal]:
+        """
+        Create proposals for many leads through the OpenAI Batch API. Cheaper than
+        per-lead calls but completes within the batch window, so meant for offline runs.
+        """
+        jobs = self._prepare_proposals(lead_ids)
+        if not jobs:
+            return []
+        
+        # Cached prompts are answered locally; only the rest go into the batch.
+        # custom_id is the proposal_id, which stays unique even if a lead is listed twice
+        contents = {}
+        prompt_hashes = {}
+        lines = []
+        for lead_data, qualification_data, proposal in jobs:
+            messages = self._proposal_messages(lead_data, qualification_data, proposal)
+            prompt_hash = self._prompt_hash(messages)
+            cached = self._cached_response(prompt_hash)
+            if cached is not None:
+                contents[proposal.proposal_id] = cached
+                continue
+            prompt_hashes[proposal.proposal_id] = prompt_hash
+            lines.append(json.dumps({
+                "custom_id": proposal.proposal_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.llm_config['model'],
+                    "messages": messages,
+                    "temperature": 0.7
+                }
+            }))
+        
+        if lines:
+            try:
+                batch_file = self.openai_client.files.create(
+                    file=("proposals.jsonl", "\n".join(lines).encode("utf-8")),
+                    purpose="batch"
+                )
+                batch = self.openai_client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+                
+                while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+                    time.sleep(poll_interval)
+                    batch = self.openai_client.batches.retrieve(batch.id)
+                
+                if batch.output_file_id:
+                    output = self.openai_client.files.content(batch.output_file_id).text
+                    for line in output.splitlines():
+                        if not line.strip():
+                            continue
+                        result = json.loads(line)
+                        response = result.get('response') or {}
+                        if response.get('status_code') == 200:
+                            content = response['body']['choices'][0]['message']['content']
+                            contents[result['custom_id']] = content
+                            self._store_response(prompt_hashes[result['custom_id']], content)
+                else:
+                    print(f"Proposal batch {batch.id} finished with status {batch.status}")
+                
+            except Exception as e:
+                print(f"Error generating proposal content: {str(e)}")
+        
+        # Requests that failed or never ran fall back to the template proposal
+        proposals = []
+        for lead_data, _, proposal in jobs:
+            content = contents.get(proposal.proposal_id)
+            proposal.custom_notes = content if content is not None else self.generate_fallback_proposal(lead_data, proposal)
+            proposals.append(proposal)
+        
+        if save:
+            self.save_proposals_bulk(proposals)
+        
+        return proposals
+    
+    def _proposal_row(self, proposal: SalesProposal) -> Tuple:
+        """Parameters for INSERT_PROPOSAL_SQL"""
+        return (
             proposal.lead_id, proposal.proposal_id, proposal.package.value,
             proposal.monthly_price, proposal.setup_fee, proposal.total_first_month,
-            json.dumps(proposal.services_included), json.dumps(proposal.deliverables),
+            _json_list(tuple(proposal.services_included)), _json_list(tuple(proposal.deliverables)),
             proposal.timeline, proposal.custom_notes, proposal.discount_percentage,
             proposal.proposal_date.isoformat(), proposal.expiry_date.isoformat(),
             proposal.status
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+    
+    def _executemany_in_transaction(self, sql: str, rows) -> None:
+        """Run executemany inside one explicit transaction (a single commit for the batch)"""
+        try:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(sql, rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+    
+    def save_proposal(self, proposal: SalesProposal):
+        """Save proposal to database"""
+        self.conn.execute(INSERT_PROPOSAL_SQL, self._proposal_row(proposal))
     
-    def create_deal(self, lead_id: int, proposal_id: str) -> SalesDeal:
-        """Create a sales deal for tracking"""
+    def save_proposals_bulk(self, proposals: List[SalesProposal]):
+        """Save many proposals in one transaction"""
+        self._executemany_in_transaction(
+            INSERT_PROPOSAL_SQL, (self._proposal_row(proposal) for proposal in proposals)
+        )
+    
+    def create_deal(self, lead_id: int, proposal_id: str, save: bool = True) -> SalesDeal:
+        """Create a sales deal for tracking (pass save=False to batch via save_deals_bulk)"""
         
         # Get proposal data
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM sales_proposals WHERE proposal_id = ?', (proposal_id,))
+        cursor = self.conn.execute('SELECT monthly_price FROM sales_proposals WHERE proposal_id = ?', (proposal_id,))
         proposal_row = cursor.fetchone()
         
         if not proposal_row:
-            conn.close()
             return None
         
-        proposal_columns = [desc[0] for desc in cursor.description]
-        proposal_data = dict(zip(proposal_columns, proposal_row))
-        
-        conn.close()
-        
         # Create deal
         deal = SalesDeal(
             lead_id=lead_id,
             deal_id=str(uuid.uuid4())[:8],
             stage=DealStage.PROPOSAL_SENT,
             proposal_id=proposal_id,
-            value=proposal_data['monthly_price'] * 12,  # Annual value
+            value=proposal_row['monthly_price'] * 12,  # Annual value
             probability=0.3,  # Initial probability
             expected_close_date=datetime.now() + timedelta(days=30)
         )
         
         # Save deal
-        self.save_deal(deal)
+        if save:
+            self.save_deal(deal)
         
         return deal
     
-    def save_deal(self, deal: SalesDeal):
-        """Save deal to database"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO sales_deals (
-                lead_id, deal_id, stage, proposal_id, value, probability,
-                expected_close_date, last_activity, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    def _deal_row(self, deal: SalesDeal) -> Tuple:
+        """Parameters for INSERT_DEAL_SQL"""
+        return (
             deal.lead_id, deal.deal_id, deal.stage.value, deal.proposal_id,
             deal.value, deal.probability,
             deal.expected_close_date.isoformat() if deal.expected_close_date else None,
             deal.last_activity.isoformat(), deal.notes
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+    
+    def save_deal(self, deal: SalesDeal):
+        """Save deal to database"""
+        self._ensure_deal_cache()
+        self.conn.execute(INSERT_DEAL_SQL, self._deal_row(deal))
+    
+    def save_deals_bulk(self, deals: List[SalesDeal]):
+        """Save many deals in one transaction"""
+        self._ensure_deal_cache()
+        self._executemany_in_transaction(INSERT_DEAL_SQL, (self._deal_row(deal) for deal in deals))
     
     def handle_objection(self, objection: str, deal_context: Dict) -> str:
         """Handle sales objections using AI"""
@@ -607,16 +1083,10 @@ class SalesAutomationAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert sales professional specializing in digital marketing services. Handle objections professionally and persuasively."},
-                    {"role": "user", "content": objection_prompt}
-                ],
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
+            return self._cached_completion([
+                {"role": "system", "content": "You are an expert sales professional specializing in digital marketing services. Handle objections professionally and persuasively."},
+                {"role": "user", "content": objection_prompt}
+            ])
             
         except Exception as e:
             print(f"Error handling objection: {str(e)}")
@@ -625,145 +1095,130 @@ class SalesAutomationAgent:
     def generate_fallback_objection_response(self, objection: str) -> str:
         """Generate fallback objection response"""
         
-        common_responses = {
-            'price': "I understand budget is a concern. Let's look at the ROI - our clients typically see a 3-5x return on their marketing investment within 6 months. Would you like to discuss a smaller package or payment plan?",
-            'time': "I appreciate that timing is important. We can actually start with a smaller scope and scale up as you see results. What timeline would work better for you?",
-            'results': "That's a valid concern. We provide detailed monthly reports and guarantee specific KPIs. If we don't meet our commitments in the first 90 days, we'll work for free until we do.",
-            'competition': "It's smart to compare options. What specific concerns do you have about our approach compared to others you're considering?"
-        }
-        
         objection_lower = objection.lower()
         
-        if any(word in objection_lower for word in ['price', 'cost', 'expensive', 'budget']):
-            return common_responses['price']
-        elif any(word in objection_lower for word in ['time', 'timing', 'busy', 'schedule']):
-            return common_responses['time']
-        elif any(word in objection_lower for word in ['results', 'guarantee', 'proof', 'work']):
-            return common_responses['results']
-        elif any(word in objection_lower for word in ['competitor', 'other', 'compare', 'shopping']):
-            return common_responses['competition']
-        else:
-            return "I understand your concern. Could you tell me more about what's holding you back so I can address it properly?"
+        for category, words in OBJECTION_KEYWORDS:
+            for word in words:
+                if word in objection_lower:
+                    return OBJECTION_RESPONSES[category]
+        
+        return DEFAULT_OBJECTION_RESPONSE
     
     def update_deal_stage(self, deal_id: str, new_stage: DealStage, notes: str = ""):
         """Update deal stage and probability"""
         
-        # Stage probability mapping
-        stage_probabilities = {
-            DealStage.INITIAL_CONTACT: 0.1,
-            DealStage.DISCOVERY: 0.2,
-            DealStage.PROPOSAL_SENT: 0.3,
-            DealStage.NEGOTIATION: 0.6,
-            DealStage.CONTRACT_SENT: 0.8,
-            DealStage.CLOSED_WON: 1.0,
-            DealStage.CLOSED_LOST: 0.0
-        }
-        
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        stage = new_stage.value
         
-        cursor.execute('''
+        # Notes keep only their most recent MAX_DEAL_NOTES_CHARS characters
+        self.conn.execute('''
             UPDATE sales_deals SET 
                 stage = ?, 
                 probability = ?, 
                 last_activity = ?,
-                notes = notes || ?
+                notes = substr(COALESCE(notes, '') || ?, -?)
             WHERE deal_id = ?
         ''', (
-            new_stage.value,
-            stage_probabilities[new_stage],
+            stage,
+            STAGE_PROBABILITIES[stage],
             datetime.now().isoformat(),
             f" {notes}",
+            MAX_DEAL_NOTES_CHARS,
             deal_id
         ))
-        
-        conn.commit()
-        conn.close()
     
     def get_sales_pipeline(self) -> List[Dict]:
         """Get current sales pipeline"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT sd.*, l.company_name, l.contact_name, sp.monthly_price
-            FROM sales_deals sd
-            JOIN leads l ON sd.lead_id = l.id
-            LEFT JOIN sales_proposals sp ON sd.proposal_id = sp.proposal_id
-            WHERE sd.stage NOT IN ('closed_won', 'closed_lost')
-            ORDER BY sd.probability DESC, sd.value DESC
+        self._ensure_deal_cache()
+        cursor = self.conn.execute('''
+            SELECT id, lead_id, deal_id, stage, proposal_id, value, probability,
+                   expected_close_date, last_activity, notes,
+                   company_name_cache AS company_name,
+                   contact_name_cache AS contact_name,
+                   monthly_price_cache AS monthly_price
+            FROM sales_deals
+            WHERE stage NOT IN ('closed_won', 'closed_lost') AND company_name_cache IS NOT NULL
+            ORDER BY probability DESC, value DESC
         ''')
         
-        columns = [desc[0] for desc in cursor.description]
-        pipeline = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        pipeline = [dict(row) for row in cursor]
         
-        conn.close()
         return pipeline
     
+    def get_top_opportunities(self, n: int = 5) -> List[Tuple[str, int, float]]:
+        """(company_name, value, probability) for the n most likely open deals, in pipeline order"""
+        self._ensure_deal_cache()
+        cursor = self.conn.execute('''
+            SELECT company_name_cache, value, probability
+            FROM sales_deals
+            WHERE stage NOT IN ('closed_won', 'closed_lost') AND company_name_cache IS NOT NULL
+            ORDER BY probability DESC, value DESC
+            LIMIT ?
+        ''', (n,))
+        return cursor.fetchmany(n)
+    
+    def count_active_deals(self) -> int:
+        """Number of deals in the current pipeline"""
+        self._ensure_deal_cache()
+        cursor = self.conn.execute('''
+            SELECT COUNT(*)
+            FROM sales_deals
+            WHERE stage NOT IN ('closed_won', 'closed_lost') AND company_name_cache IS NOT NULL
+        ''')
+        return cursor.fetchone()[0]
+    
     def get_sales_metrics(self) -> Dict[str, any]:
         """Get sales performance metrics"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
-        
-        # Total pipeline value
-        cursor.execute('''
-            SELECT SUM(value * probability) as weighted_pipeline
-            FROM sales_deals 
-            WHERE stage NOT IN ('closed_won', 'closed_lost')
-        ''')
-        weighted_pipeline = cursor.fetchone()[0] or 0
-        
-        # Closed won deals
-        cursor.execute('''
-            SELECT COUNT(*) as won_count, SUM(value) as won_value
-            FROM sales_deals 
-            WHERE stage = 'closed_won'
-        ''')
-        won_stats = cursor.fetchone()
-        
-        # Conversion rates by stage
-        cursor.execute('''
-            SELECT stage, COUNT(*) as count
+        # One pass over sales_deals; the per-stage aggregates cover all three metrics
+        cursor = self.conn.execute('''
+            SELECT stage, COUNT(*), SUM(value * probability), SUM(value)
             FROM sales_deals
             GROUP BY stage
         ''')
-        stage_stats = dict(cursor.fetchall())
         
-        conn.close()
+        weighted_pipeline = 0
+        won_deals = 0
+        won_value = 0
+        stage_stats = {}
+        for stage, count, weighted_value, total_value in cursor.fetchall():
+            stage_stats[stage] = count
+            if stage == 'closed_won':
+                won_deals = count
+                won_value = total_value or 0
+            elif stage is not None and stage != 'closed_lost':
+                weighted_pipeline += weighted_value or 0
         
         return {
             'weighted_pipeline': weighted_pipeline,
-            'won_deals': won_stats[0] or 0,
-            'won_value': won_stats[1] or 0,
+            'won_deals': won_deals,
+            'won_value': won_value,
             'stage_distribution': stage_stats
         }
     
     def generate_sales_report(self) -> str:
         """Generate sales performance report"""
         metrics = self.get_sales_metrics()
-        pipeline = self.get_sales_pipeline()
         
-        report = f"""
+        parts = [f"""
 SALES PERFORMANCE REPORT
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 PIPELINE OVERVIEW:
 - Weighted Pipeline Value: ${metrics['weighted_pipeline']:,.2f}
-- Active Deals: {len(pipeline)}
+- Active Deals: {self.count_active_deals()}
 - Closed Won Deals: {metrics['won_deals']}
 - Total Won Value: ${metrics['won_value']:,.2f}
 
 STAGE DISTRIBUTION:
-"""
+"""]
         
-        for stage, count in metrics['stage_distribution'].items():
-            report += f"- {stage.replace('_', ' ').title()}: {count} deals\n"
+        parts.extend(f"- {stage.replace('_', ' ').title()}: {count} deals\n"
+                     for stage, count in metrics['stage_distribution'].items())
         
-        report += "\nTOP OPPORTUNITIES:\n"
-        for deal in pipeline[:5]:
-            report += f"- {deal['company_name']}: ${deal['value']:,} ({deal['probability']:.0%} probability)\n"
+        parts.append("\nTOP OPPORTUNITIES:\n")
+        parts.extend(f"- {company_name}: ${value:,} ({probability:.0%} probability)\n"
+                     for company_name, value, probability in self.get_top_opportunities(5))
         
-        return report
+        return "".join(parts)
 
 
 def main():
@@ -771,9 +1226,7 @@ def main():
     agent = SalesAutomationAgent()
     
     # Get qualified leads
-    conn = sqlite3.connect("leads.db")
-    cursor = conn.cursor()
-    cursor.execute('''
+    cursor = agent.conn.execute('''
         SELECT l.id FROM leads l
         JOIN lead_qualifications lq ON l.id = lq.lead_id
         WHERE lq.status = 'qualified'
@@ -781,29 +1234,29 @@ def main():
     ''')
     
     lead_ids = [row[0] for row in cursor.fetchall()]
-    conn.close()
     
     if not lead_ids:
         print("No qualified leads found.")
         return
     
     # Create proposals
-    for lead_id in lead_ids:
-        print(f"Creating proposal for lead {lead_id}...")
-        proposal = agent.create_proposal(lead_id)
-        
-        if proposal:
-            print(f"- Proposal ID: {proposal.proposal_id}")
-            print(f"- Package: {proposal.package.value}")
-            print(f"- Monthly Price: ${proposal.monthly_price:,}")
-            print(f"- Setup Fee: ${proposal.setup_fee:,}")
-            print(f"- Discount: {proposal.discount_percentage:.1%}")
-            
-            # Create deal
-            deal = agent.create_deal(lead_id, proposal.proposal_id)
-            print(f"- Deal ID: {deal.deal_id}")
-            print(f"- Deal Value: ${deal.value:,}")
-            print()
+    print(f"Creating proposals for {len(lead_ids)} leads...")
+    proposals = asyncio.run(agent.create_proposals_bulk(lead_ids))
+    
+    # Create deals
+    deals = [agent.create_deal(proposal.lead_id, proposal.proposal_id, save=False) for proposal in proposals]
+    agent.save_deals_bulk(deals)
+    
+    for proposal, deal in zip(proposals, deals):
+        print(f"Lead {proposal.lead_id}:")
+        print(f"- Proposal ID: {proposal.proposal_id}")
+        print(f"- Package: {proposal.package.value}")
+        print(f"- Monthly Price: ${proposal.monthly_price:,}")
+        print(f"- Setup Fee: ${proposal.setup_fee:,}")
+        print(f"- Discount: {proposal.discount_percentage:.1%}")
+        print(f"- Deal ID: {deal.deal_id}")
+        print(f"- Deal Value: ${deal.value:,}")
+        print()
     
     # Show pipeline
     pipeline = agent.get_sales_pipeline()
@@ -6,14 +6,56 @@ Manages API keys, rate limits, and fallback mechanisms for the AI Marketing Agen
 import os
 import json
 import time
+import atexit
 import logging
+import threading
+import queue
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import sqlite3
 
+try:
+    import orjson
+    
+    def _dumps(value) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(value) -> bytes:
+        return json.dumps(value, indent=2).encode()
+    
+    _loads = json.loads
+
+
+# Rate-limit window lengths in seconds
+MINUTE_WINDOW = 60.0
+DAY_WINDOW = 86400.0
+
+SELECT_HEALTH_SQL = '''
+    SELECT api_name, SUM(requests_count), SUM(errors_count)
+    FROM api_usage
+    WHERE date = ?
+    GROUP BY api_name
+'''
+
+INSERT_LOG_SQL = '''
+    INSERT INTO api_requests_log (
+        api_name, endpoint, status_code, response_time, error_message, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+UPSERT_USAGE_SQL = '''
+    INSERT INTO api_usage (api_name, date, requests_count, errors_count)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(api_name, date) DO UPDATE SET
+        requests_count = requests_count + excluded.requests_count,
+        errors_count = errors_count + excluded.errors_count
+'''
 
-@dataclass
+
+@dataclass(slots=True)
 class APIConfig:
     """Configuration for a single API"""
     name: str
@@ -24,18 +66,53 @@ class APIConfig:
     free_tier_limit: int = 100
     enabled: bool = True
     priority: int = 1  # Lower number = higher priority
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the configuration, as stored in the config file"""
+        return {
+            "name": self.name,
+            "api_key": self.api_key,
+            "base_url": self.base_url,
+            "rate_limit_per_minute": self.rate_limit_per_minute,
+            "rate_limit_per_day": self.rate_limit_per_day,
+            "free_tier_limit": self.free_tier_limit,
+            "enabled": self.enabled,
+            "priority": self.priority
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class APIUsage:
     """Track API usage statistics"""
     api_name: str
     requests_today: int = 0
-    requests_this_minute: int = 0
-    last_request_time: Optional[datetime] = None
+    last_request_time: float = 0.0  # time.monotonic(); 0.0 = never
     total_requests: int = 0
     errors_today: int = 0
-    last_error_time: Optional[datetime] = None
+    last_error_time: float = 0.0  # time.monotonic(); 0.0 = never
+    usage_date: str = ""
+    # Wall-clock values for the health report
+    last_request_wall: float = 0.0
+    last_error_iso: Optional[str] = None
+    # Sliding-window counters (monotonic seconds) for the per-minute and per-day limits
+    prev_minute_count: int = 0
+    curr_minute_count: int = 0
+    curr_minute_start: float = 0.0
+    prev_day_count: int = 0
+    curr_day_count: int = 0
+    curr_day_start: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Usage statistics for reporting (rate-limit window state is left out)"""
+        return {
+            "api_name": self.api_name,
+            "requests_today": self.requests_today,
+            "total_requests": self.total_requests,
+            "errors_today": self.errors_today,
+            "usage_date": self.usage_date,
+            "last_request_time": self.last_request_wall or None,
+            "last_error_time": self.last_error_iso
+        }
 
 
 class APIManager:
@@ -48,15 +125,54 @@ class APIManager:
         self.database_path = database_path
         self.apis: Dict[str, APIConfig] = {}
         self.usage: Dict[str, APIUsage] = {}
+        # Enabled APIs per requested type, sorted by priority; cleared on config changes
+        self._by_type: Dict[str, List[APIConfig]] = {}
         self.logger = logging.getLogger(__name__)
+        # Window counts are accumulated per thread and folded into APIUsage every
+        # window_merge_every requests, so the common path takes no lock. Other threads
+        # cannot see those pending counts, so only APIs allowing at least
+        # local_count_min_limit requests per minute are counted this way
+        self.window_merge_every = 16
+        self.local_count_min_limit = 1000
+        self._tls = threading.local()
+        self._window_lock = threading.Lock()
+        # Local date string, reused until the wall clock passes the next midnight
+        self._today_str = ""
+        self._today_until = 0.0
+        
+        # Request log rows and daily usage increments are queued for a writer thread,
+        # which stores up to log_batch_size of them per transaction
+        self.log_batch_size = 64
+        self._write_q = queue.SimpleQueue()
+        
+        # One autocommit connection shared by all writers; _db_lock serializes its use
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-20000')
+        self._db_lock = threading.Lock()
         
         self.setup_database()
         self.load_configuration()
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="api-log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def close(self):
+        """Flush queued request logs, stop the writer thread and close the database connection"""
+        if self._writer.is_alive():
+            self._flush_log_buffer()
+            self._write_q.put(None)
+            self._writer.join()
+        with self._db_lock:
+            self._conn.close()
     
     def setup_database(self):
         """Setup API usage tracking tables"""
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS api_usage (
@@ -83,15 +199,24 @@ class APIManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_requests_api_ts
+            ON api_requests_log (api_name, timestamp DESC)
+        ''')
+        
+        # Partial index: only failed requests are indexed, so successful writes pay nothing
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_requests_status
+            ON api_requests_log (api_name, status_code)
+            WHERE status_code >= 400
+        ''')
     
     def load_configuration(self):
         """Load API configurations from file or create default"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config_data = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    config_data = _loads(f.read())
                 
                 for api_name, config in config_data.items():
                     self.apis[api_name] = APIConfig(**config)
@@ -100,8 +225,10 @@ class APIManager:
                 self.create_default_configuration()
                 
         except Exception as e:
-            self.logger.error(f"Error loading API configuration: {str(e)}")
+            self.logger.error("Error loading API configuration: %s", e)
             self.create_default_configuration()
+        
+        self._invalidate_type_cache()
     
     def create_default_configuration(self):
         """Create default API configuration with free tier APIs"""
@@ -159,57 +286,94 @@ class APIManager:
         try:
             config_data = {}
             for api_name, config in self.apis.items():
-                config_data[api_name] = asdict(config)
+                config_data[api_name] = config.to_dict()
             
-            with open(self.config_file, 'w') as f:
-                json.dump(config_data, f, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(_dumps(config_data))
                 
         except Exception as e:
-            self.logger.error(f"Error saving API configuration: {str(e)}")
+            self.logger.error("Error saving API configuration: %s", e)
     
     def get_available_api(self, api_type: str) -> Optional[APIConfig]:
         """
         Get the best available API for a specific type based on priority and usage limits
         """
-        # Filter APIs by type (based on name pattern)
-        type_apis = []
-        for api_name, config in self.apis.items():
-            if api_type.lower() in api_name.lower() and config.enabled:
-                type_apis.append(config)
-        
-        if not type_apis:
-            return None
-        
-        # Sort by priority (lower number = higher priority)
-        type_apis.sort(key=lambda x: x.priority)
+        type_apis = self._by_type.get(api_type)
+        if type_apis is None:
+            type_apis = self._by_type[api_type] = self._apis_for_type(api_type)
         
         # Check each API for availability
         for api_config in type_apis:
-            if self.can_make_request(api_config.name):
+            if self._can_make_request_cfg(api_config, self.usage[api_config.name]):
                 return api_config
         
         return None
     
+    def _apis_for_type(self, api_type: str) -> List[APIConfig]:
+        """Enabled APIs whose name contains api_type, sorted by priority (lower number = higher priority)"""
+        api_type = api_type.lower()
+        type_apis = [config for api_name, config in self.apis.items()
+                     if api_type in api_name.lower() and config.enabled]
+        type_apis.sort(key=lambda x: x.priority)
+        return type_apis
+    
+    def _invalidate_type_cache(self):
+        """Forget cached per-type API lists after a configuration change"""
+        self._by_type.clear()
+    
     def can_make_request(self, api_name: str) -> bool:
         """Check if we can make a request to the specified API"""
-        if api_name not in self.apis or not self.apis[api_name].enabled:
+        config = self.apis.get(api_name)
+        if config is None:
+            return False
+        return self._can_make_request_cfg(config, self.usage[api_name])
+    
+    def _can_make_request_cfg(self, config: APIConfig, usage: APIUsage) -> bool:
+        """can_make_request for an already looked-up config and usage record"""
+        if not config.enabled:
             return False
         
-        config = self.apis[api_name]
-        usage = self.usage[api_name]
+        now = time.monotonic()
+        self._advance_windows(usage, now)
+        # This thread's requests not yet folded into the shared counts
+        pending = self._pending_counts().get(config.name, 0)
         
-        # Check daily limit
-        if usage.requests_today >= config.rate_limit_per_day:
+        # Weight the previous window by how much of it still overlaps the sliding window
+        minute_estimate = (usage.prev_minute_count * (1 - (now - usage.curr_minute_start) / MINUTE_WINDOW)
+                           + usage.curr_minute_count + pending)
+        if minute_estimate >= config.rate_limit_per_minute:
             return False
         
-        # Check minute limit
-        now = datetime.now()
-        if usage.last_request_time:
-            time_diff = now - usage.last_request_time
-            if time_diff < timedelta(minutes=1) and usage.requests_this_minute >= config.rate_limit_per_minute:
-                return False
+        day_estimate = (usage.prev_day_count * (1 - (now - usage.curr_day_start) / DAY_WINDOW)
+                        + usage.curr_day_count + pending)
+        return day_estimate < config.rate_limit_per_day
+    
+    def _pending_counts(self) -> Dict[str, int]:
+        """Per-thread request counts waiting to be folded into the window counters"""
+        pending = getattr(self._tls, 'pending', None)
+        if pending is None:
+            pending = self._tls.pending = {}
+        return pending
+    
+    def _advance_windows(self, usage: APIUsage, now: float):
+        """Shift the minute and day windows forward when `now` falls in a new window"""
+        minute_start = now // MINUTE_WINDOW * MINUTE_WINDOW
+        day_start = now // DAY_WINDOW * DAY_WINDOW
+        if minute_start == usage.curr_minute_start and day_start == usage.curr_day_start:
+            return
         
-        return True
+        with self._window_lock:
+            if minute_start != usage.curr_minute_start:
+                adjacent = minute_start - usage.curr_minute_start == MINUTE_WINDOW
+                usage.prev_minute_count = usage.curr_minute_count if adjacent else 0
+                usage.curr_minute_count = 0
+                usage.curr_minute_start = minute_start
+            
+            if day_start != usage.curr_day_start:
+                adjacent = day_start - usage.curr_day_start == DAY_WINDOW
+                usage.prev_day_count = usage.curr_day_count if adjacent else 0
+                usage.curr_day_count = 0
+                usage.curr_day_start = day_start
     
     def record_request(self, api_name: str, endpoint: str = "", status_code: int = 200, 
                       response_time: float = 0.0, error_message: str = ""):
@@ -218,116 +382,162 @@ class APIManager:
             self.usage[api_name] = APIUsage(api_name=api_name)
         
         usage = self.usage[api_name]
-        now = datetime.now()
+        now = time.monotonic()
+        
+        # Daily counters start over on the first request of a new day
+        today = self._today()
+        if usage.usage_date != today:
+            usage.usage_date = today
+            usage.requests_today = 0
+            usage.errors_today = 0
         
         # Update usage counters
         usage.total_requests += 1
         usage.requests_today += 1
-        
-        # Reset minute counter if needed
-        if usage.last_request_time and (now - usage.last_request_time) >= timedelta(minutes=1):
-            usage.requests_this_minute = 0
-        
-        usage.requests_this_minute += 1
         usage.last_request_time = now
+        usage.last_request_wall = time.time()
+        
+        # Count the request in this thread's pending counts, folding them into
+        # the shared minute and day windows once enough have built up
+        self._advance_windows(usage, now)
+        pending = self._pending_counts()
+        count = pending.get(api_name, 0) + 1
+        config = self.apis.get(api_name)
+        if (count >= self.window_merge_every or config is None
+                or config.rate_limit_per_minute < self.local_count_min_limit):
+            with self._window_lock:
+                usage.curr_minute_count += count
+                usage.curr_day_count += count
+            count = 0
+        pending[api_name] = count
         
         # Track errors
         if status_code >= 400:
             usage.errors_today += 1
             usage.last_error_time = now
+            usage.last_error_iso = datetime.fromtimestamp(usage.last_request_wall).isoformat()
         
-        # Log to database
-        self.log_request_to_database(api_name, endpoint, status_code, response_time, error_message)
-        
-        # Update daily usage in database
-        self.update_daily_usage(api_name)
+        # Log the request and count it in the daily usage table
+        self.log_request_to_database(api_name, endpoint, status_code, response_time, error_message,
+                                     usage.usage_date)
+    
+    def _today(self) -> str:
+        """Today's local date as YYYY-MM-DD, recomputed only after midnight"""
+        if time.time() >= self._today_until:
+            now = datetime.now()
+            self._today_str = now.date().isoformat()
+            midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            self._today_until = midnight.timestamp()
+        return self._today_str
     
     def log_request_to_database(self, api_name: str, endpoint: str, status_code: int, 
-                               response_time: float, error_message: str):
-        """Log individual request to database"""
-        try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO api_requests_log (
-                    api_name, endpoint, status_code, response_time, error_message
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (api_name, endpoint, status_code, response_time, error_message))
+                               response_time: float, error_message: str, date: str = ""):
+        """Queue a request log row and usage increment for the writer thread"""
+        # Timestamp now (UTC, CURRENT_TIMESTAMP format) rather than at write time
+        row = (api_name, endpoint, status_code, response_time, error_message,
+               time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()))
+        key = (api_name, date or self._today())
+        self._write_q.put_nowait((row, key, status_code >= 400))
+    
+    def _writer_loop(self):
+        """Drain the write queue in batches, one transaction per batch, until a None arrives"""
+        while True:
+            items = [self._write_q.get()]
+            while len(items) < self.log_batch_size:
+                try:
+                    items.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
             
-            conn.commit()
-            conn.close()
+            rows = []
+            deltas: Dict[tuple, List[int]] = {}
+            waiters = []
+            stop = False
+            for item in items:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    row, key, failed = item
+                    rows.append(row)
+                    delta = deltas.get(key)
+                    if delta is None:
+                        delta = deltas[key] = [0, 0]
+                    delta[0] += 1
+                    delta[1] += failed
             
-        except Exception as e:
-            self.logger.error(f"Error logging API request: {str(e)}")
+            if rows:
+                self._write_log_rows(rows, [(api_name, date, requests, errors)
+                                            for (api_name, date), (requests, errors) in deltas.items()])
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
     
-    def update_daily_usage(self, api_name: str):
-        """Update daily usage statistics in database"""
+    def _flush_log_buffer(self):
+        """Block until everything queued so far has been written"""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._write_q.put(done)
+        done.wait()
+    
+    def _write_log_rows(self, rows: List[tuple], deltas: List[tuple]):
+        """Insert request log rows and add the usage increments to api_usage in a single transaction"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            today = datetime.now().date().isoformat()
-            usage = self.usage[api_name]
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO api_usage (
-                    api_name, date, requests_count, errors_count
-                ) VALUES (?, ?, ?, ?)
-            ''', (api_name, today, usage.requests_today, usage.errors_today))
-            
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                try:
+                    self._conn.execute('BEGIN IMMEDIATE')
+                    self._conn.executemany(INSERT_LOG_SQL, rows)
+                    self._conn.executemany(UPSERT_USAGE_SQL, deltas)
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    if self._conn.in_transaction:
+                        self._conn.execute('ROLLBACK')
+                    raise
             
         except Exception as e:
-            self.logger.error(f"Error updating daily usage: {str(e)}")
-    
-    def reset_daily_counters(self):
-        """Reset daily usage counters (should be called daily)"""
-        for usage in self.usage.values():
-            usage.requests_today = 0
-            usage.errors_today = 0
+            self.logger.error("Error logging API request: %s", e)
     
     def get_usage_stats(self, api_name: str = None) -> Dict[str, Any]:
         """Get usage statistics for specific API or all APIs"""
         if api_name:
             if api_name in self.usage:
-                return asdict(self.usage[api_name])
+                return self.usage[api_name].to_dict()
             return {}
         
-        return {name: asdict(usage) for name, usage in self.usage.items()}
+        return {name: usage.to_dict() for name, usage in self.usage.items()}
     
     def get_api_health(self) -> Dict[str, Dict[str, Any]]:
         """Get health status of all APIs"""
-        health_status = {}
+        self._flush_log_buffer()
+        today = self._today()
+        with self._db_lock:
+            daily = {row[0]: row[1:] for row in self._conn.execute(SELECT_HEALTH_SQL, (today,))}
         
-        for api_name, config in self.apis.items():
-            usage = self.usage[api_name]
-            
-            # Calculate health metrics
-            error_rate = 0.0
-            if usage.total_requests > 0:
-                error_rate = (usage.errors_today / usage.total_requests) * 100
-            
-            usage_percentage = (usage.requests_today / config.rate_limit_per_day) * 100
-            
-            health_status[api_name] = {
+        def status(api_name: str, config: APIConfig, usage: APIUsage) -> Dict[str, Any]:
+            requests_today, errors_today = daily.get(api_name, (0, 0))
+            return {
                 "enabled": config.enabled,
                 "can_make_request": self.can_make_request(api_name),
-                "usage_percentage": usage_percentage,
-                "error_rate": error_rate,
-                "requests_today": usage.requests_today,
+                "usage_percentage": requests_today / config.rate_limit_per_day * 100,
+                "error_rate": errors_today / requests_today * 100 if requests_today else 0.0,
+                "requests_today": requests_today,
                 "daily_limit": config.rate_limit_per_day,
-                "last_request": usage.last_request_time.isoformat() if usage.last_request_time else None,
-                "last_error": usage.last_error_time.isoformat() if usage.last_error_time else None
+                "last_request": (datetime.fromtimestamp(usage.last_request_wall).isoformat()
+                                 if usage.last_request_wall else None),
+                "last_error": usage.last_error_iso
             }
         
-        return health_status
+        return {api_name: status(api_name, config, self.usage[api_name])
+                for api_name, config in self.apis.items()}
     
     def add_api(self, config: APIConfig):
         """Add a new API configuration"""
         self.apis[config.name] = config
         self.usage[config.name] = APIUsage(api_name=config.name)
+        self._invalidate_type_cache()
         self.save_configuration()
     
     def update_api(self, api_name: str, **kwargs):
@@ -337,28 +547,37 @@ class APIManager:
             for key, value in kwargs.items():
                 if hasattr(config, key):
                     setattr(config, key, value)
+            self._invalidate_type_cache()
             self.save_configuration()
     
     def disable_api(self, api_name: str):
         """Disable an API"""
         if api_name in self.apis:
             self.apis[api_name].enabled = False
+            self._invalidate_type_cache()
             self.save_configuration()
     
     def enable_api(self, api_name: str):
         """Enable an API"""
         if api_name in self.apis:
             self.apis[api_name].enabled = True
+            self._invalidate_type_cache()
             self.save_configuration()
 
 
-# Global API manager instance
-api_manager = APIManager()
+# Global API manager instance, created on first use
+_api_manager: Optional[APIManager] = None
+_api_manager_lock = threading.Lock()
 
 
 def get_api_manager() -> APIManager:
     """Get the global API manager instance"""
-    return api_manager
+    global _api_manager
+    if _api_manager is None:
+        with _api_manager_lock:
+            if _api_manager is None:
+                _api_manager = APIManager()
+    return _api_manager
 
 
 if __name__ == "__main__":
@@ -4,20 +4,184 @@ Provides integration with various free/freemium APIs for the AI Marketing Agency
 Uses Hunter.io and Clearbit free tiers for core functionality
 """
 
+import asyncio
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from functools import cache, lru_cache
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from itertools import islice
+from collections import OrderedDict
+from types import MappingProxyType
 from dataclasses import dataclass
 import json
 from api_config import get_api_manager, APIConfig
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import tldextract
+    # Bundled public suffix snapshot only, so lookups never go to the network
+    _extract_tld = tldextract.TLDExtract(suffix_list_urls=())
+except ImportError:
+    _extract_tld = None
+
 # Free API keys for development/testing
 HUNTER_API_KEY = "DEMO_API_KEY"  # Sign up at hunter.io/api
 CLEARBIT_API_KEY = "sk_DEMO_KEY"  # Sign up at clearbit.com/docs
 
+# Concurrent requests per batch, matched to the session's connection pool size
+MAX_CONCURRENT_REQUESTS = 20
+
+# Cheap local checks that decide a lookup without spending an API request
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+DOMAIN_RE = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$", re.IGNORECASE)
+DISPOSABLE_DOMAINS = frozenset({
+    "mailinator.com", "guerrillamail.com", "guerrillamail.net", "sharklasers.com", "10minutemail.com",
+    "tempmail.com", "temp-mail.org", "throwawaymail.com", "yopmail.com", "trashmail.com",
+    "getnada.com", "dispostable.com", "maildrop.cc", "fakeinbox.com", "mailnesia.com"
+})
+
+# Webmail providers: their domains say nothing about the lead's company, so they are never enriched
+FREE_EMAIL_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "ymail.com", "outlook.com", "hotmail.com", "live.com",
+    "msn.com", "aol.com", "icloud.com", "me.com", "mac.com", "protonmail.com", "proton.me",
+    "gmx.com", "mail.com", "zoho.com", "yandex.com"
+})
+
+# Shared stand-in for a missing flag object in Abstract API responses
+_EMPTY = MappingProxyType({})
+
+# Successful lookups are reused for a day, keeping at most this many per API client
+RESULT_CACHE_SIZE = 10_000
+RESULT_CACHE_TTL = 86400  # seconds
+
+
+def create_session() -> requests.Session:
+    """Keep-alive session that retries throttled and transient server errors with backoff"""
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the final response back so its status is recorded
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class TokenBucket:
+    """Token bucket: refills at `rate` tokens per second and holds at most `max_tokens`"""
+    
+    def __init__(self, rate: float, max_tokens: int):
+        self.rate = rate
+        self.max_tokens = max_tokens
+        self.tokens = float(max_tokens)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def add_new_tokens(self):
+        """Refill for the time elapsed since the last update (caller holds the lock)"""
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def try_acquire(self) -> float:
+        """Take a token and return 0.0, or return the seconds until one is available"""
+        with self._lock:
+            self.add_new_tokens()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+    
+    def wait_for_token(self):
+        """Block until a token has been taken"""
+        delay = self.try_acquire()
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.try_acquire()
+    
+    async def wait_for_token_async(self, stop: Optional[asyncio.Event] = None) -> bool:
+        """Wait without blocking the event loop until a token is taken; False if `stop` is set first"""
+        delay = self.try_acquire()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            if stop is not None and stop.is_set():
+                return False
+            delay = self.try_acquire()
+        return True
 
-@dataclass
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being stored"""
+    
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        """Cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any):
+        """Store value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: str):
+        """Drop key so the next lookup goes to the API"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+async def _none() -> None:
+    """Awaitable placeholder for a lookup that is skipped"""
+    return None
+
+
+# One bucket per API, shared by every client of that API
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config: APIConfig) -> TokenBucket:
+    """Token bucket pacing requests to the API's per-minute limit, bursting up to that limit"""
+    rate = config.rate_limit_per_minute / 60.0
+    with _rate_limiters_lock:
+        bucket = _rate_limiters.get(config.name)
+        if bucket is None or bucket.rate != rate:
+            bucket = _rate_limiters[config.name] = TokenBucket(rate, max(1, config.rate_limit_per_minute))
+        return bucket
+
+
+@dataclass(slots=True)
 class EmailValidationResult:
     """Result from email validation API"""
     email: str
@@ -30,7 +194,7 @@ class EmailValidationResult:
     error_message: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CompanyEnrichmentResult:
     """Result from company enrichment API"""
     domain: str
@@ -45,7 +209,7 @@ class CompanyEnrichmentResult:
     error_message: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LeadResult:
     """Result from lead generation API"""
     lead_id: str
@@ -60,6 +224,103 @@ class LeadResult:
     error_message: Optional[str] = None
 
 
+# Abstract API response parsing. With msgspec the JSON is decoded straight into typed
+# structs in one pass; otherwise it goes through a dict
+try:
+    import msgspec
+    
+    class _AbstractFlag(msgspec.Struct, frozen=True):
+        value: Any = False
+    
+    _NO_FLAG = _AbstractFlag()
+    
+    class AbstractEmailResponse(msgspec.Struct):
+        is_valid_format: _AbstractFlag = _NO_FLAG
+        is_mx_found: _AbstractFlag = _NO_FLAG
+        is_disposable_email: _AbstractFlag = _NO_FLAG
+        is_free_email: _AbstractFlag = _NO_FLAG
+        is_role_email: _AbstractFlag = _NO_FLAG
+        quality_score: Any = 0.0
+        autocorrect: Any = ""
+    
+    class AbstractCompanyResponse(msgspec.Struct):
+        name: Any = None
+        industry: Any = None
+        employees_count: Any = None
+        annual_revenue: Any = None
+        country: Any = None
+        description: Any = None
+        technologies: Any = msgspec.field(default_factory=list)
+        linkedin_url: Any = None
+        twitter_url: Any = None
+        facebook_url: Any = None
+    
+    _decode_email_response = msgspec.json.Decoder(AbstractEmailResponse).decode
+    _decode_company_response = msgspec.json.Decoder(AbstractCompanyResponse).decode
+    
+    def _parse_email_validation(email: str, content: bytes) -> EmailValidationResult:
+        parsed = _decode_email_response(content)
+        return EmailValidationResult(
+            email=email,
+            is_valid=parsed.is_valid_format.value and parsed.is_mx_found.value,
+            is_disposable=parsed.is_disposable_email.value,
+            is_free_provider=parsed.is_free_email.value,
+            is_role_email=parsed.is_role_email.value,
+            quality_score=parsed.quality_score,
+            suggestion=parsed.autocorrect
+        )
+    
+    def _parse_company_enrichment(domain: str, content: bytes) -> CompanyEnrichmentResult:
+        parsed = _decode_company_response(content)
+        return CompanyEnrichmentResult(
+            domain=domain,
+            company_name=parsed.name,
+            industry=parsed.industry,
+            employee_count=parsed.employees_count,
+            annual_revenue=parsed.annual_revenue,
+            location=parsed.country,
+            description=parsed.description,
+            technologies=parsed.technologies,
+            social_media={
+                "linkedin": parsed.linkedin_url,
+                "twitter": parsed.twitter_url,
+                "facebook": parsed.facebook_url
+            }
+        )
+except ImportError:
+    def _parse_email_validation(email: str, content: bytes) -> EmailValidationResult:
+        # Flags arrive as {"value": bool} objects
+        get = _loads(content).get
+        return EmailValidationResult(
+            email=email,
+            is_valid=get("is_valid_format", _EMPTY).get("value", False) and
+                    get("is_mx_found", _EMPTY).get("value", False),
+            is_disposable=get("is_disposable_email", _EMPTY).get("value", False),
+            is_free_provider=get("is_free_email", _EMPTY).get("value", False),
+            is_role_email=get("is_role_email", _EMPTY).get("value", False),
+            quality_score=get("quality_score", 0.0),
+            suggestion=get("autocorrect", "")
+        )
+    
+    def _parse_company_enrichment(domain: str, content: bytes) -> CompanyEnrichmentResult:
+        data = _loads(content)
+        return CompanyEnrichmentResult(
+            domain=domain,
+            company_name=data.get("name"),
+            industry=data.get("industry"),
+            employee_count=data.get("employees_count"),
+            annual_revenue=data.get("annual_revenue"),
+            location=data.get("country"),
+            description=data.get("description"),
+            technologies=data.get("technologies", []),
+            social_media={
+                "linkedin": data.get("linkedin_url"),
+                "twitter": data.get("twitter_url"),
+                "facebook": data.get("facebook_url")
+            }
+        )
+
+
 class EmailValidationAPI:
     """
     Email validation using Abstract API
@@ -67,12 +328,47 @@ class EmailValidationAPI:
     
     def __init__(self):
         self.api_manager = get_api_manager()
+        self.session = create_session()
+        self._cache = ResultCache()
         self.logger = logging.getLogger(__name__)
     
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+    
+    def invalidate(self, email: str):
+        """Forget the cached validation for email"""
+        self._cache.invalidate(email)
+    
     def validate_email(self, email: str) -> EmailValidationResult:
         """
         Validate a single email address
         """
+        cached = self._cache.get(email)
+        if cached is not None:
+            return cached
+        
+        if not EMAIL_RE.match(email):
+            return EmailValidationResult(
+                email=email,
+                is_valid=False,
+                is_disposable=False,
+                is_free_provider=False,
+                is_role_email=False,
+                quality_score=0.0,
+                error_message="Invalid email format"
+            )
+        
+        if email.rsplit("@", 1)[1].lower() in DISPOSABLE_DOMAINS:
+            return EmailValidationResult(
+                email=email,
+                is_valid=False,
+                is_disposable=True,
+                is_free_provider=False,
+                is_role_email=False,
+                quality_score=0.0
+            )
+        
         api_config = self.api_manager.get_available_api("email")
         
         if not api_config:
@@ -87,6 +383,9 @@ class EmailValidationAPI:
             )
         
         start_time = time.time()
+        response_time = None
+        status_code = 500
+        error_msg = ""
         
         try:
             url = f"{api_config.base_url}"
@@ -95,41 +394,17 @@ class EmailValidationAPI:
                 "email": email
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response_time = time.time() - start_time
+            status_code = response.status_code
             
-            # Record the request
-            self.api_manager.record_request(
-                api_config.name,
-                "validate",
-                response.status_code,
-                response_time
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Parse Abstract API response
-                return EmailValidationResult(
-                    email=email,
-                    is_valid=data.get("is_valid_format", {}).get("value", False) and 
-                            data.get("is_mx_found", {}).get("value", False),
-                    is_disposable=data.get("is_disposable_email", {}).get("value", False),
-                    is_free_provider=data.get("is_free_email", {}).get("value", False),
-                    is_role_email=data.get("is_role_email", {}).get("value", False),
-                    quality_score=data.get("quality_score", 0.0),
-                    suggestion=data.get("autocorrect", "")
-                )
+            if status_code == 200:
+                result = _parse_email_validation(email, response.content)
+                self._cache.set(email, result)
+                return result
             
             else:
-                error_msg = f"API request failed with status {response.status_code}"
-                self.api_manager.record_request(
-                    api_config.name,
-                    "validate",
-                    response.status_code,
-                    response_time,
-                    error_msg
-                )
+                error_msg = f"API request failed with status {status_code}"
                 
                 return EmailValidationResult(
                     email=email,
@@ -142,17 +417,10 @@ class EmailValidationAPI:
                 )
         
         except Exception as e:
+            status_code = 500
             error_msg = f"Email validation error: {str(e)}"
             self.logger.error(error_msg)
             
-            self.api_manager.record_request(
-                api_config.name,
-                "validate",
-                500,
-                time.time() - start_time,
-                error_msg
-            )
-            
             return EmailValidationResult(
                 email=email,
                 is_valid=False,
@@ -162,26 +430,47 @@ class EmailValidationAPI:
                 quality_score=0.0,
                 error_message=error_msg
             )
+        
+        finally:
+            # One usage record per request, however it ended
+            if response_time is None:
+                response_time = time.time() - start_time
+            self.api_manager.record_request(api_config.name, "validate", status_code, response_time, error_msg)
     
-    def validate_emails_batch(self, emails: List[str]) -> List[EmailValidationResult]:
+    async def validate_email_async(self, email: str) -> EmailValidationResult:
+        """Validate a single email address on a worker thread"""
+        return await asyncio.to_thread(self.validate_email, email)
+    
+    async def validate_emails_batch_async(self, emails: List[str]) -> List[EmailValidationResult]:
         """
-        Validate multiple email addresses
+        Validate multiple email addresses concurrently; stops starting new requests once rate limited
         """
-        results = []
+        api_name = "abstract_email_validation"
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        rate_limited = asyncio.Event()
+        if api_name not in self.api_manager.apis:
+            rate_limited.set()
+        else:
+            bucket = get_rate_limiter(self.api_manager.apis[api_name])
         
-        for email in emails:
-            # Check rate limits before each request
-            if not self.api_manager.can_make_request("abstract_email_validation"):
-                self.logger.warning("Rate limit reached for email validation API")
-                break
-            
-            result = self.validate_email(email)
-            results.append(result)
-            
-            # Small delay to respect rate limits
-            time.sleep(0.1)
+        async def validate(email):
+            async with semaphore:
+                if rate_limited.is_set() or not await bucket.wait_for_token_async(rate_limited):
+                    return None
+                if not self.api_manager.can_make_request(api_name):
+                    self.logger.warning("Rate limit reached for email validation API")
+                    rate_limited.set()
+                    return None
+                return await self.validate_email_async(email)
         
-        return results
+        results = await asyncio.gather(*(validate(email) for email in emails))
+        return [result for result in results if result is not None]
+    
+    def validate_emails_batch(self, emails: List[str]) -> List[EmailValidationResult]:
+        """
+        Validate multiple email addresses
+        """
+        return asyncio.run(self.validate_emails_batch_async(emails))
 
 
 class CompanyEnrichmentAPI:
@@ -191,12 +480,32 @@ class CompanyEnrichmentAPI:
     
     def __init__(self):
         self.api_manager = get_api_manager()
+        self.session = create_session()
+        self._cache = ResultCache()
         self.logger = logging.getLogger(__name__)
     
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+    
+    def invalidate(self, domain: str):
+        """Forget the cached enrichment for domain"""
+        self._cache.invalidate(domain)
+    
     def enrich_company(self, domain: str) -> CompanyEnrichmentResult:
         """
         Enrich company data by domain
         """
+        cached = self._cache.get(domain)
+        if cached is not None:
+            return cached
+        
+        if not DOMAIN_RE.match(domain):
+            return CompanyEnrichmentResult(
+                domain=domain,
+                error_message="Invalid domain"
+            )
+        
         api_config = self.api_manager.get_available_api("company")
         
         if not api_config:
@@ -206,6 +515,9 @@ class CompanyEnrichmentAPI:
             )
         
         start_time = time.time()
+        response_time = None
+        status_code = 500
+        error_msg = ""
         
         try:
             url = f"{api_config.base_url}"
@@ -214,46 +526,17 @@ class CompanyEnrichmentAPI:
                 "domain": domain
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=15)
             response_time = time.time() - start_time
+            status_code = response.status_code
             
-            # Record the request
-            self.api_manager.record_request(
-                api_config.name,
-                "enrich",
-                response.status_code,
-                response_time
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Parse Abstract API response
-                return CompanyEnrichmentResult(
-                    domain=domain,
-                    company_name=data.get("name"),
-                    industry=data.get("industry"),
-                    employee_count=data.get("employees_count"),
-                    annual_revenue=data.get("annual_revenue"),
-                    location=data.get("country"),
-                    description=data.get("description"),
-                    technologies=data.get("technologies", []),
-                    social_media={
-                        "linkedin": data.get("linkedin_url"),
-                        "twitter": data.get("twitter_url"),
-                        "facebook": data.get("facebook_url")
-                    }
-                )
+            if status_code == 200:
+                result = _parse_company_enrichment(domain, response.content)
+                self._cache.set(domain, result)
+                return result
             
             else:
-                error_msg = f"API request failed with status {response.status_code}"
-                self.api_manager.record_request(
-                    api_config.name,
-                    "enrich",
-                    response.status_code,
-                    response_time,
-                    error_msg
-                )
+                error_msg = f"API request failed with status {status_code}"
                 
                 return CompanyEnrichmentResult(
                     domain=domain,
@@ -261,41 +544,55 @@ class CompanyEnrichmentAPI:
                 )
         
         except Exception as e:
+            status_code = 500
             error_msg = f"Company enrichment error: {str(e)}"
             self.logger.error(error_msg)
             
-            self.api_manager.record_request(
-                api_config.name,
-                "enrich",
-                500,
-                time.time() - start_time,
-                error_msg
-            )
-            
             return CompanyEnrichmentResult(
                 domain=domain,
                 error_message=error_msg
             )
+        
+        finally:
+            # One usage record per request, however it ended
+            if response_time is None:
+                response_time = time.time() - start_time
+            self.api_manager.record_request(api_config.name, "enrich", status_code, response_time, error_msg)
     
-    def enrich_companies_batch(self, domains: List[str]) -> List[CompanyEnrichmentResult]:
+    async def enrich_company_async(self, domain: str) -> CompanyEnrichmentResult:
+        """Enrich company data on a worker thread"""
+        return await asyncio.to_thread(self.enrich_company, domain)
+    
+    async def enrich_companies_batch_async(self, domains: List[str]) -> List[CompanyEnrichmentResult]:
         """
-        Enrich multiple companies
+        Enrich multiple companies concurrently; stops starting new requests once rate limited
         """
-        results = []
+        api_name = "abstract_company_enrichment"
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        rate_limited = asyncio.Event()
+        if api_name not in self.api_manager.apis:
+            rate_limited.set()
+        else:
+            bucket = get_rate_limiter(self.api_manager.apis[api_name])
         
-        for domain in domains:
-            # Check rate limits before each request
-            if not self.api_manager.can_make_request("abstract_company_enrichment"):
-                self.logger.warning("Rate limit reached for company enrichment API")
-                break
-            
-            result = self.enrich_company(domain)
-            results.append(result)
-            
-            # Small delay to respect rate limits
-            time.sleep(0.2)
+        async def enrich(domain):
+            async with semaphore:
+                if rate_limited.is_set() or not await bucket.wait_for_token_async(rate_limited):
+                    return None
+                if not self.api_manager.can_make_request(api_name):
+                    self.logger.warning("Rate limit reached for company enrichment API")
+                    rate_limited.set()
+                    return None
+                return await self.enrich_company_async(domain)
         
-        return results
+        results = await asyncio.gather(*(enrich(domain) for domain in domains))
+        return [result for result in results if result is not None]
+    
+    def enrich_companies_batch(self, domains: List[str]) -> List[CompanyEnrichmentResult]:
+        """
+        Enrich multiple companies
+        """
+        return asyncio.run(self.enrich_companies_batch_async(domains))
 
 
 class LeadGenerationAPI:
@@ -305,19 +602,55 @@ class LeadGenerationAPI:
     
     def __init__(self):
         self.api_manager = get_api_manager()
+        self.session = create_session()
         self.logger = logging.getLogger(__name__)
     
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+    
     def get_leads(self, limit: int = 10, filters: Dict[str, Any] = None) -> List[LeadResult]:
         """
         Get leads from Apideck Lead API
         """
-        api_config = self.api_manager.get_available_api("lead")
-        
-        if not api_config:
-            self.logger.error("No available lead generation API")
-            return []
-        
+        return list(islice(self.iter_leads(filters, page_size=limit), limit))
+    
+    def iter_leads(self, filters: Dict[str, Any] = None, page_size: int = 100) -> Iterator[LeadResult]:
+        """
+        Stream leads from Apideck Lead API, requesting the next page only when the current one is used up
+        """
+        cursor = None
+        while True:
+            api_config = self.api_manager.get_available_api("lead")
+            
+            if not api_config:
+                self.logger.error("No available lead generation API")
+                return
+            
+            params = {"limit": page_size}
+            if filters:
+                params.update(filters)
+            if cursor:
+                params["cursor"] = cursor
+            
+            page = self._fetch_leads_page(api_config, params)
+            if page is None:
+                return
+            
+            leads, cursor = page
+            yield from leads
+            if not cursor:
+                return
+    
+    def _fetch_leads_page(self, api_config: APIConfig,
+                          params: Dict[str, Any]) -> Optional[Tuple[List[LeadResult], Optional[str]]]:
+        """
+        Request one page of leads; returns its leads and the next page's cursor, or None on failure
+        """
         start_time = time.time()
+        response_time = None
+        status_code = 500
+        error_msg = ""
         
         try:
             url = f"{api_config.base_url}leads"
@@ -326,23 +659,12 @@ class LeadGenerationAPI:
                 "Content-Type": "application/json"
             }
             
-            params = {"limit": limit}
-            if filters:
-                params.update(filters)
-            
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = self.session.get(url, headers=headers, params=params, timeout=15)
             response_time = time.time() - start_time
+            status_code = response.status_code
             
-            # Record the request
-            self.api_manager.record_request(
-                api_config.name,
-                "leads",
-                response.status_code,
-                response_time
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
+            if status_code == 200:
+                data = _loads(response.content)
                 leads = []
                 
                 for lead_data in data.get("data", []):
@@ -358,34 +680,28 @@ class LeadGenerationAPI:
                     )
                     leads.append(lead)
                 
-                return leads
+                # Apideck returns the next page's cursor under meta.cursors.next
+                cursor = ((data.get("meta") or {}).get("cursors") or {}).get("next")
+                return leads, cursor
             
             else:
-                error_msg = f"API request failed with status {response.status_code}"
-                self.api_manager.record_request(
-                    api_config.name,
-                    "leads",
-                    response.status_code,
-                    response_time,
-                    error_msg
-                )
+                error_msg = f"API request failed with status {status_code}"
                 
                 self.logger.error(error_msg)
-                return []
+                return None
         
         except Exception as e:
+            status_code = 500
             error_msg = f"Lead generation error: {str(e)}"
             self.logger.error(error_msg)
             
-            self.api_manager.record_request(
-                api_config.name,
-                "leads",
-                500,
-                time.time() - start_time,
-                error_msg
-            )
-            
-            return []
+            return None
+        
+        finally:
+            # One usage record per request, however it ended
+            if response_time is None:
+                response_time = time.time() - start_time
+            self.api_manager.record_request(api_config.name, "leads", status_code, response_time, error_msg)
 
 
 class APIIntegrationService:
@@ -400,6 +716,18 @@ class APIIntegrationService:
         self.api_manager = get_api_manager()
         self.logger = logging.getLogger(__name__)
     
+    def close(self):
+        """Close the HTTP sessions of all integrations"""
+        self.email_validator.close()
+        self.company_enricher.close()
+        self.lead_generator.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def validate_lead_email(self, email: str) -> EmailValidationResult:
         """Validate a lead's email address"""
         return self.email_validator.validate_email(email)
@@ -416,40 +744,96 @@ class APIIntegrationService:
         """
         Process a lead with full enrichment (email validation + company data)
         """
+        return asyncio.run(self.process_lead_with_enrichment_async(lead_data))
+    
+    async def process_lead_with_enrichment_async(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a lead with full enrichment, validating the email and enriching the company concurrently
+        """
         enriched_lead = lead_data.copy()
+        email = lead_data.get("email")
+        domain = self._company_domain(email or "")
         
-        # Validate email if present
-        if lead_data.get("email"):
-            email_result = self.validate_lead_email(lead_data["email"])
-            enriched_lead["email_validation"] = {
-                "is_valid": email_result.is_valid,
-                "is_disposable": email_result.is_disposable,
-                "is_free_provider": email_result.is_free_provider,
-                "quality_score": email_result.quality_score,
-                "suggestion": email_result.suggestion
-            }
+        # Email validation if present, company enrichment if a domain is available
+        email_result, company_result = await asyncio.gather(
+            self.email_validator.validate_email_async(email) if email else _none(),
+            self.company_enricher.enrich_company_async(domain) if domain else _none()
+        )
         
-        # Enrich company data if domain is available
-        domain = self.extract_domain_from_email(lead_data.get("email", ""))
-        if domain:
-            company_result = self.enrich_lead_company(domain)
-            enriched_lead["company_enrichment"] = {
-                "industry": company_result.industry,
-                "employee_count": company_result.employee_count,
-                "annual_revenue": company_result.annual_revenue,
-                "location": company_result.location,
-                "description": company_result.description,
-                "technologies": company_result.technologies
-            }
+        if email_result is not None:
+            enriched_lead["email_validation"] = self._email_validation_fields(email_result)
+        if company_result is not None:
+            enriched_lead["company_enrichment"] = self._company_enrichment_fields(company_result)
         
         return enriched_lead
     
-    def extract_domain_from_email(self, email: str) -> Optional[str]:
-        """Extract domain from email address"""
+    def process_leads_with_enrichment(self, leads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process many leads, validating each distinct email and enriching each distinct domain once
+        """
+        emails = list(dict.fromkeys(lead["email"] for lead in leads if lead.get("email")))
+        domains = list(dict.fromkeys(filter(None, (self._company_domain(email) for email in emails))))
+        
+        email_results = {result.email: result for result in self.email_validator.validate_emails_batch(emails)}
+        company_results = {result.domain: result for result in self.company_enricher.enrich_companies_batch(domains)}
+        
+        enriched_leads = []
+        for lead_data in leads:
+            enriched_lead = lead_data.copy()
+            email = lead_data.get("email")
+            
+            if email:
+                email_result = email_results.get(email) or self.validate_lead_email(email)
+                enriched_lead["email_validation"] = self._email_validation_fields(email_result)
+            
+            domain = self._company_domain(email or "")
+            if domain:
+                company_result = company_results.get(domain) or self.enrich_lead_company(domain)
+                enriched_lead["company_enrichment"] = self._company_enrichment_fields(company_result)
+            
+            enriched_leads.append(enriched_lead)
+        
+        return enriched_leads
+    
+    def _email_validation_fields(self, email_result: EmailValidationResult) -> Dict[str, Any]:
+        """Email validation summary attached to an enriched lead"""
+        return {
+            "is_valid": email_result.is_valid,
+            "is_disposable": email_result.is_disposable,
+            "is_free_provider": email_result.is_free_provider,
+            "quality_score": email_result.quality_score,
+            "suggestion": email_result.suggestion
+        }
+    
+    def _company_enrichment_fields(self, company_result: CompanyEnrichmentResult) -> Dict[str, Any]:
+        """Company enrichment summary attached to an enriched lead"""
+        return {
+            "industry": company_result.industry,
+            "employee_count": company_result.employee_count,
+            "annual_revenue": company_result.annual_revenue,
+            "location": company_result.location,
+            "description": company_result.description,
+            "technologies": company_result.technologies
+        }
+    
+    @staticmethod
+    @lru_cache(maxsize=10000)
+    def extract_domain_from_email(email: str) -> Optional[str]:
+        """Extract domain from email address, reduced to the registered domain when tldextract is installed"""
         if "@" in email:
-            return email.split("@")[1].lower()
+            domain = email.split("@")[1].lower()
+            if _extract_tld is not None:
+                return _extract_tld(domain).registered_domain or domain
+            return domain
         return None
     
+    def _company_domain(self, email: str) -> Optional[str]:
+        """Domain worth enriching for an email, or None for missing and webmail domains"""
+        domain = self.extract_domain_from_email(email)
+        if domain in FREE_EMAIL_DOMAINS:
+            return None
+        return domain
+    
     def get_api_status(self) -> Dict[str, Any]:
         """Get status of all API integrations"""
         return self.api_manager.get_api_health()
@@ -459,9 +843,15 @@ class APIIntegrationService:
         return self.api_manager.get_usage_stats()
 
 
+@cache
+def get_integration_service() -> APIIntegrationService:
+    """Get the shared API integration service, so its HTTP sessions and caches are reused"""
+    return APIIntegrationService()
+
+
 if __name__ == "__main__":
     # Test the API integrations
-    service = APIIntegrationService()
+    service = get_integration_service()
     
     print("API Status:")
     status = service.get_api_status()